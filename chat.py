@@ -17,6 +17,7 @@ from src.agents.meta_orchestrator import MetaOrchestrator
 from src.core.config import settings
 from src.core import database as db_module
 from src.core.database import Database
+from src.core.persistence import persistence
 
 
 class AgentChat:
@@ -247,6 +248,9 @@ async def main():
         print(f"\n❌ Fatal error: {str(e)}")
         import traceback
         traceback.print_exc()
+    finally:
+        # Write activity logs still buffered
+        await persistence.cleanup()
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+"""Makes the repository root importable so tests can import `src`"""
@@ -16,6 +16,7 @@ from src.agents.meta_orchestrator import MetaOrchestrator
 from src.core.config import settings
 from src.core import database as db_module
 from src.core.database import Database
+from src.core.persistence import persistence
 from src.core.progress_tracker import progress_tracker, ProgressStatus
 
 
@@ -67,6 +68,7 @@ async def demo_execution():
         10.0,
         "Analyzing task requirements"
     )
+    await progress_tracker.flush_display()
     
     # Create execution plan
     print("\n🗺️  Creating Execution Plan...")
@@ -86,6 +88,7 @@ async def demo_execution():
             30.0,
             "Execution plan created"
         )
+        await progress_tracker.flush_display()
         
         # Display the plan
         print("\n✅ Execution Plan Created!")
@@ -133,9 +136,11 @@ async def demo_execution():
             "Demo execution completed"
         )
         
-        # Show summary
+        # Show summary once queued progress lines are out
+        await progress_tracker.flush_display()
         print("\n" + "=" * 80)
         progress_tracker.display_summary()
+        await progress_tracker.flush_display()
         
         print("✨ Demo Complete!")
         print("\n💡 In full mode, the platform would now:")
@@ -161,5 +166,13 @@ async def demo_execution():
         )
 
 
+async def main():
+    """Run the demo, then write any buffered activity logs"""
+    try:
+        await demo_execution()
+    finally:
+        await persistence.cleanup()
+
+
 if __name__ == "__main__":
-    asyncio.run(demo_execution())
+    asyncio.run(main())
@@ -16,6 +16,7 @@ from src.learning.persistence import AgentPersistenceSystem
 from src.core.config import settings
 from src.core import database as db_module
 from src.core.database import Database
+from src.core.persistence import persistence
 
 
 async def main():
@@ -130,6 +131,7 @@ async def main():
     finally:
         # Cleanup
         print("\n🧹 Cleaning up...")
+        await persistence.cleanup()
         print("✅ Cleanup complete")
 
 
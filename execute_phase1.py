@@ -8,10 +8,11 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from src.agents.meta_orchestrator import MetaOrchestrator
+from src.core.persistence import persistence
 import uuid
 
 
-async def main():
+async def run_phase1():
     print('🚀 PHASE 1: Foundation & Core Infrastructure')
     print('=' * 80)
     print('Building: Backend + Frontend + Database + Simple Agent')
@@ -71,5 +72,13 @@ async def main():
         traceback.print_exc()
 
 
+async def main():
+    """Run phase 1, then write any buffered activity logs"""
+    try:
+        await run_phase1()
+    finally:
+        await persistence.cleanup()
+
+
 if __name__ == "__main__":
     asyncio.run(main())
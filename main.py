@@ -21,6 +21,7 @@ from src.learning.persistence import AgentPersistenceSystem
 from src.core.config import settings
 from src.core import database as db_module
 from src.core.database import Database
+from src.core.persistence import persistence
 
 
 class AutonomousAgentTeam:
@@ -198,6 +199,9 @@ class AutonomousAgentTeam:
         if self.learning:
             await self.learning.cleanup()
         
+        # Write activity logs still buffered
+        await persistence.cleanup()
+        
         print("✅ Cleanup complete")
 
 
@@ -6,23 +6,36 @@ Allows Claude (and other MCP clients) to interact with the autonomous agents.
 """
 
 import asyncio
-import json
 import sys
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from src.agents.meta_orchestrator import MetaOrchestrator
+from src.agents.meta_orchestrator import get_orchestrator
 from src.core.config import settings
 from src.core import database as db_module
 from src.core.database import Database
+from src.core.persistence import persistence
 
 # Global orchestrator instance
 orchestrator = None
 active_tasks = {}
 
 
+def _text_content(result: Any) -> str:
+    """Pretty JSON for a tool result; orjson also handles UUIDs and datetimes"""
+    return orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _send(message: dict):
+    """Write one JSON-RPC message line to stdout"""
+    sys.stdout.buffer.write(orjson.dumps(message) + b"\n")
+    sys.stdout.buffer.flush()
+
+
 async def initialize_platform():
     """Initialize the platform"""
     global orchestrator
@@ -39,8 +52,7 @@ async def initialize_platform():
         pass
     
     # Initialize orchestrator
-    orchestrator = MetaOrchestrator()
-    await orchestrator.initialize()
+    orchestrator = await get_orchestrator()
 
 
 async def handle_task_request(task_description: str) -> dict:
@@ -260,7 +272,7 @@ async def handle_mcp_request(method: str, params: dict) -> dict:
                 "content": [
                     {
                         "type": "text",
-                        "text": json.dumps(result, indent=2)
+                        "text": _text_content(result)
                     }
                 ]
             }
@@ -271,7 +283,7 @@ async def handle_mcp_request(method: str, params: dict) -> dict:
                 "content": [
                     {
                         "type": "text",
-                        "text": json.dumps(result, indent=2)
+                        "text": _text_content(result)
                     }
                 ]
             }
@@ -282,7 +294,7 @@ async def handle_mcp_request(method: str, params: dict) -> dict:
                 "content": [
                     {
                         "type": "text",
-                        "text": json.dumps(result, indent=2)
+                        "text": _text_content(result)
                     }
                 ]
             }
@@ -293,7 +305,7 @@ async def handle_mcp_request(method: str, params: dict) -> dict:
                 "content": [
                     {
                         "type": "text",
-                        "text": json.dumps(result, indent=2)
+                        "text": _text_content(result)
                     }
                 ]
             }
@@ -311,39 +323,41 @@ async def main():
     print("✅ Ready for MCP requests", file=sys.stderr)
     
     # Read from stdin, write to stdout (MCP protocol)
-    while True:
-        try:
-            line = sys.stdin.readline()
-            if not line:
-                break
-            
-            request = json.loads(line)
-            method = request.get("method")
-            params = request.get("params", {})
-            request_id = request.get("id")
-            
-            result = await handle_mcp_request(method, params)
-            
-            response = {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "result": result
-            }
-            
-            print(json.dumps(response))
-            sys.stdout.flush()
-            
-        except Exception as e:
-            error_response = {
-                "jsonrpc": "2.0",
-                "id": request.get("id") if 'request' in locals() else None,
-                "error": {
-                    "code": -32603,
-                    "message": str(e)
+    try:
+        while True:
+            try:
+                line = sys.stdin.readline()
+                if not line:
+                    break
+                
+                request = orjson.loads(line)
+                method = request.get("method")
+                params = request.get("params", {})
+                request_id = request.get("id")
+                
+                result = await handle_mcp_request(method, params)
+                
+                response = {
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "result": result
                 }
-            }
-            print(json.dumps(error_response))
-            sys.stdout.flush()
+                
+                _send(response)
+                
+            except Exception as e:
+                error_response = {
+                    "jsonrpc": "2.0",
+                    "id": request.get("id") if 'request' in locals() else None,
+                    "error": {
+                        "code": -32603,
+                        "message": str(e)
+                    }
+                }
+                _send(error_response)
+    finally:
+        # Write activity logs still buffered
+        await persistence.cleanup()
 
 
 if __name__ == "__main__":
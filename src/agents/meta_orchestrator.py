@@ -22,9 +22,11 @@ from ..models.schemas import (
     TaskCreate, ExecutionPlan, AgentSpec, AgentRole, 
     TaskStatus, ActivityLog
 )
-from ..models.database import Task, AgentInstance, ActivityLog as ActivityLogDB
+from ..models.database import Task, AgentInstance
 from ..core.config import settings
+from ..core import database
 from ..core.database import get_db_session
+from ..core.persistence import persistence
 from ..core.utils import extract_json_from_response, normalize_agent_role
 
 
@@ -455,18 +457,12 @@ class MetaOrchestrator:
     
     async def _log_activity(self, task_id: uuid.UUID, activity_type: str, message: str):
         """Log activity for real-time updates"""
-        try:
-            async for session in get_db_session():
-                activity = ActivityLogDB(
-                    task_id=task_id,
-                    activity_type=activity_type,
-                    message=message
-                )
-                session.add(activity)
-                await session.commit()
-        except RuntimeError:
+        if database.db is None:
             # Database not initialized - skip logging for now
-            pass
+            return
+        
+        # Buffered and written in batches with the other activity logs
+        persistence.activity_log.add(task_id, activity_type, message)
     
     async def _handle_execution_error(self, task_id: uuid.UUID, error: str):
         """Handle execution errors with autonomous recovery"""
@@ -490,3 +486,13 @@ class MetaOrchestrator:
 
 # Global orchestrator instance
 orchestrator = MetaOrchestrator()
+_orchestrator_init_lock = asyncio.Lock()
+
+
+async def get_orchestrator() -> MetaOrchestrator:
+    """Return the global orchestrator, building its agent pool on first use"""
+    if not orchestrator.agent_pool:
+        async with _orchestrator_init_lock:
+            if not orchestrator.agent_pool:
+                await orchestrator.initialize()
+    return orchestrator
@@ -27,6 +27,10 @@ class Settings(BaseSettings):
     minio_secret_key: str = "minioadmin"
     minio_bucket_name: str = "strands-platform"
     minio_use_ssl: bool = False
+    minio_max_workers: int = 64
+    minio_pending_uploads: int = 8
+    minio_max_concurrency: int = 32
+    minio_list_page_size: int = 1000
     
     # E2B Sandboxes
     e2b_api_key: str
@@ -1,17 +1,40 @@
+import struct
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+import orjson
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy import text
 import asyncpg
+from uuid_utils.compat import uuid7
 
 
 class Base(DeclarativeBase):
     pass
 
 
+# HNSW candidate list size for vector searches (recall vs. latency)
+HNSW_EF_SEARCH = 100
+
+
 class Database:
-    def __init__(self, database_url: str):
+    def __init__(self, database_url: str, pool_size: int = 25, max_overflow: int = 25):
         self.database_url = database_url
-        self.engine = create_async_engine(database_url, echo=False)  # Set to False to reduce noise
+        self.engine = create_async_engine(
+            database_url,
+            echo=False,  # Set to False to reduce noise
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_pre_ping=True,
+            # Room for every distinct hot statement so none is recompiled
+            query_cache_size=1200,
+            # Set once per connection at startup rather than per query
+            connect_args={"server_settings": {"hnsw.ef_search": str(HNSW_EF_SEARCH)}}
+        )
         self.async_session_maker = async_sessionmaker(
             self.engine, class_=AsyncSession, expire_on_commit=False
         )
@@ -43,3 +66,96 @@ async def get_db_session():
         raise RuntimeError("Database not initialized. Call initialize_database() first.")
     async for session in db.get_session():
         yield session
+
+
+@asynccontextmanager
+async def get_db_transaction():
+    """Get a database session wrapped in a single BEGIN ... COMMIT"""
+    if db is None:
+        raise RuntimeError("Database not initialized. Call initialize_database() first.")
+    async with db.async_session_maker() as session, session.begin():
+        yield session
+
+
+async def copy_records(table_name: str, columns: Iterable[str], records: List[tuple]) -> int:
+    """
+    Insert rows with a single binary COPY on a pooled connection
+    
+    Returns:
+        Number of rows inserted
+    """
+    if db is None:
+        raise RuntimeError("Database not initialized. Call initialize_database() first.")
+    if not records:
+        return 0
+    
+    async with db.engine.connect() as conn:
+        raw = (await conn.get_raw_connection()).driver_connection
+        await raw.copy_records_to_table(table_name, records=records, columns=list(columns))
+    
+    return len(records)
+
+
+# Columns written by bulk_insert_chunks (id and bq_embedding are generated)
+_CHUNK_COLUMNS = ("public_id", "document_id", "chunk_text", "chunk_index", "embedding", "chunk_metadata")
+
+
+def _encode_halfvec(value: Any) -> bytes:
+    """pgvector halfvec binary format: uint16 dim, uint16 unused, float16 values"""
+    data = np.asarray(value, dtype=">f2")
+    return struct.pack(">HH", data.shape[0], 0) + data.tobytes()
+
+
+def _decode_halfvec(data: bytes) -> np.ndarray:
+    dim, _ = struct.unpack_from(">HH", data)
+    return np.frombuffer(data, dtype=">f2", count=dim, offset=4).astype(np.float16)
+
+
+async def bulk_insert_chunks(rows: Iterable[Dict[str, Any]]) -> int:
+    """
+    Insert knowledge chunks with a single binary COPY
+    
+    Each row needs document_id and may carry public_id, chunk_text, chunk_index,
+    embedding (array-like) and chunk_metadata. Use the ORM for single rows.
+    
+    Returns:
+        Number of rows inserted
+    """
+    if db is None:
+        raise RuntimeError("Database not initialized. Call initialize_database() first.")
+    
+    records = [
+        (
+            row.get("public_id") or uuid7(),
+            row["document_id"],
+            row.get("chunk_text"),
+            row.get("chunk_index"),
+            row.get("embedding"),
+            orjson.dumps(row["chunk_metadata"]).decode() if row.get("chunk_metadata") is not None else None
+        )
+        for row in rows
+    ]
+    if not records:
+        return 0
+    
+    async with db.engine.connect() as conn:
+        raw = (await conn.get_raw_connection()).driver_connection
+        
+        # Send embeddings in pgvector's binary format instead of 1536-float
+        # text; the codec is scoped to this COPY so ORM binds are unaffected
+        await raw.set_type_codec(
+            "halfvec",
+            encoder=_encode_halfvec,
+            decoder=_decode_halfvec,
+            format="binary"
+        )
+        try:
+            await raw.copy_records_to_table(
+                "knowledge_chunks",
+                records=records,
+                columns=_CHUNK_COLUMNS
+            )
+        finally:
+            await raw.reset_type_codec("halfvec")
+    
+    return len(records)
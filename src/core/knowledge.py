@@ -0,0 +1,90 @@
+"""
+Knowledge Base Ingestion
+
+Embeds document chunks and writes them to the knowledge_chunks table.
+"""
+
+import asyncio
+import functools
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+from openai import AsyncOpenAI
+
+from .config import settings
+from .database import bulk_insert_chunks
+
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = 1536
+
+# Inputs per embeddings request, and requests in flight at once
+EMBEDDING_BATCH_SIZE = 256
+EMBEDDING_CONCURRENCY = 8
+
+
+@functools.lru_cache(maxsize=None)
+def _openai() -> AsyncOpenAI:
+    return AsyncOpenAI(api_key=settings.openai_api_key)
+
+
+async def embed_texts(texts: Sequence[str]) -> np.ndarray:
+    """
+    Embed texts with batched, concurrent requests
+    
+    Args:
+        texts: Texts to embed
+    
+    Returns:
+        float16 array of shape (len(texts), EMBEDDING_DIMENSIONS), in input order
+    """
+    embeddings = np.empty((len(texts), EMBEDDING_DIMENSIONS), dtype=np.float16)
+    client = _openai()
+    semaphore = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+    
+    async def embed_batch(start: int):
+        async with semaphore:
+            response = await client.embeddings.create(
+                model=EMBEDDING_MODEL,
+                input=list(texts[start:start + EMBEDDING_BATCH_SIZE])
+            )
+        # Results carry their input index; don't rely on response order
+        for item in response.data:
+            embeddings[start + item.index] = item.embedding
+    
+    await asyncio.gather(*(
+        embed_batch(start) for start in range(0, len(texts), EMBEDDING_BATCH_SIZE)
+    ))
+    return embeddings
+
+
+async def ingest_chunks(
+    document_id: Any,
+    chunks: Sequence[str],
+    metadata: Optional[Sequence[Optional[Dict[str, Any]]]] = None
+) -> int:
+    """
+    Embed a document's chunks and store them with a single COPY
+    
+    Args:
+        document_id: ID of the knowledge document the chunks belong to
+        chunks: Chunk texts, in document order
+        metadata: Optional per-chunk metadata, parallel to chunks
+    
+    Returns:
+        Number of chunks stored
+    """
+    if not chunks:
+        return 0
+    
+    embeddings = await embed_texts(chunks)
+    return await bulk_insert_chunks(
+        {
+            "document_id": document_id,
+            "chunk_text": text,
+            "chunk_index": index,
+            "embedding": embeddings[index],
+            "chunk_metadata": metadata[index] if metadata else None
+        }
+        for index, text in enumerate(chunks)
+    )
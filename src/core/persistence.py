@@ -10,30 +10,191 @@ Tracks and stores:
 - Cross-session memory
 """
 
-import json
 import asyncio
-from typing import Any, Dict, List, Optional
-from datetime import datetime
+import copy
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-import pickle
 
-from sqlalchemy import select, and_
+import asyncpg
+import orjson
+import sqlalchemy.exc
+from cachetools import TTLCache
+from sqlalchemy import bindparam, select, insert, and_
 from sqlalchemy.ext.asyncio import AsyncSession
+from uuid_utils.compat import uuid7
 
 from ..models.database import (
     AgentInstance, AgentTemplate, Tool, KnowledgeDocument, 
     KnowledgeChunk, ActivityLog, Task, Project
 )
-from .database import get_db_session
+from .database import copy_records, get_db_transaction
 from .storage import StorageManager
 
 
+logger = logging.getLogger(__name__)
+
+
+# Manifest of {pattern_name: {success_rate, use_count, path}} for learned patterns
+PATTERN_INDEX_PATH = "patterns/_index.json"
+
+# Hot lookup statements, built once and reused with bound parameters
+_SELECT_AGENT_BY_NAME = select(AgentTemplate).where(AgentTemplate.name == bindparam("name"))
+_SELECT_TOOL_BY_NAME = select(Tool).where(Tool.name == bindparam("name"))
+_SELECT_TASK_ACTIVITIES = (
+    select(ActivityLog)
+    .where(ActivityLog.task_id == bindparam("task_id"))
+    .order_by(ActivityLog.timestamp)
+)
+
+
+# Errors where the same COPY may succeed if tried again
+_TRANSIENT_DB_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.InterfaceError,
+    asyncpg.exceptions.TooManyConnectionsError,
+    asyncpg.exceptions.DeadlockDetectedError,
+    sqlalchemy.exc.OperationalError,
+    sqlalchemy.exc.TimeoutError
+)
+
+
+def _is_transient_db_error(error: Exception) -> bool:
+    """Whether a failed write is worth retrying rather than a data problem"""
+    if isinstance(error, sqlalchemy.exc.DBAPIError) and error.connection_invalidated:
+        return True
+    return isinstance(error, _TRANSIENT_DB_ERRORS)
+
+
+class ActivityLogBuffer:
+    """
+    Coalesces activity log rows and writes them with one binary COPY
+    
+    A flush happens once `batch_size` rows are buffered or `flush_interval`
+    seconds after the first buffered row, whichever comes first. The
+    timestamp column is left to its server default. Batches that fail on a
+    connection or timeout error are retried with backoff.
+    """
+    
+    COLUMNS = ("public_id", "task_id", "agent_id", "activity_type", "message", "activity_metadata")
+    MAX_ATTEMPTS = 3
+    
+    def __init__(self, batch_size: int = 500, flush_interval: float = 0.1):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._rows: List[tuple] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        # Strong references so background writes aren't garbage collected
+        self._tasks: Set[asyncio.Task] = set()
+    
+    def add(
+        self,
+        task_id: str,
+        activity_type: str,
+        message: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        agent_id: Optional[str] = None
+    ):
+        """Buffer an activity log row for the next flush"""
+        self._rows.append((
+            uuid7(),
+            task_id,
+            agent_id,
+            activity_type,
+            message,
+            # Encoded here so the COPY sends the JSON text as-is
+            orjson.dumps(metadata).decode() if metadata is not None else None
+        ))
+        
+        if len(self._rows) >= self.batch_size:
+            self._spawn(self._write())
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = self._spawn(self._flush_later())
+    
+    def _spawn(self, coro: Awaitable[Any]) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+    
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        await self._write()
+    
+    async def _write(self):
+        """Write the rows buffered so far"""
+        if not self._rows:
+            return
+        
+        rows, self._rows = self._rows, []
+        await self._write_rows(rows, 1)
+    
+    async def _write_rows(self, rows: List[tuple], attempt: int):
+        """
+        COPY one batch. Transient failures retry the same batch later,
+        apart from rows logged since; a batch rejected for its data is
+        split until the offending rows are isolated and dropped.
+        """
+        try:
+            await copy_records("activity_logs", self.COLUMNS, rows)
+        except Exception as e:
+            if _is_transient_db_error(e):
+                if attempt >= self.MAX_ATTEMPTS:
+                    logger.exception("Dropping %d activity log entries after %d failed writes", len(rows), attempt)
+                    return
+                logger.warning("Could not write %d activity log entries, retrying: %s", len(rows), e)
+                self._spawn(self._retry_later(rows, attempt + 1))
+            elif len(rows) == 1:
+                logger.exception("Dropping activity log entry that can't be written: %r", rows[0])
+            else:
+                middle = len(rows) // 2
+                await self._write_rows(rows[:middle], attempt)
+                await self._write_rows(rows[middle:], attempt)
+    
+    async def _retry_later(self, rows: List[tuple], attempt: int):
+        await asyncio.sleep(self.flush_interval * 2 ** attempt)
+        await self._write_rows(rows, attempt)
+    
+    async def flush(self):
+        """Write all buffered rows, waiting for writes already under way"""
+        current = asyncio.current_task()
+        pending = [task for task in self._tasks if task is not current]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        await self._write()
+
+
 class PersistenceManager:
     """Manages persistence of all agent activities and artifacts"""
     
+    # Activity log rows are buffered and written in batches
+    ACTIVITY_BATCH_SIZE = 500
+    ACTIVITY_FLUSH_INTERVAL = 0.1  # seconds
+    
+    # Mem0 writes run in the background with exponential-backoff retries
+    MEM0_MAX_ATTEMPTS = 3
+    
     def __init__(self):
         self.storage = StorageManager()
         self.mem0_enabled = False
+        self._mem0_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mem0")
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._io_semaphore = asyncio.Semaphore(16)
+        self._pattern_index_lock = asyncio.Lock()
+        self.activity_log = ActivityLogBuffer(self.ACTIVITY_BATCH_SIZE, self.ACTIVITY_FLUSH_INTERVAL)
+        self._usage_day: Optional[int] = None
+        self._usage_day_str = ""
+        
+        # Short-lived caches for read-heavy lookups on agent spawn paths
+        self._agent_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+        self._tool_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+        self._patterns_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
         self._init_mem0()
     
     def _init_mem0(self):
@@ -48,6 +209,60 @@ class PersistenceManager:
         except ImportError:
             self.mem0_enabled = False
     
+    def _mem0_add_bg(self, *args, **kwargs):
+        """Fire-and-forget a Mem0 add on the background executor"""
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self._mem0_executor,
+            functools.partial(self._mem0_add_with_retry, *args, **kwargs)
+        )
+        future.add_done_callback(self._log_mem0_failure)
+    
+    def _mem0_add_with_retry(self, *args, **kwargs):
+        for attempt in range(self.MEM0_MAX_ATTEMPTS):
+            try:
+                return self.mem0.add(*args, **kwargs)
+            except Exception:
+                if attempt == self.MEM0_MAX_ATTEMPTS - 1:
+                    raise
+                time.sleep(2 ** attempt)
+    
+    @staticmethod
+    def _log_mem0_failure(future: asyncio.Future):
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Warning: Could not save to Mem0: {future.exception()}")
+    
+    async def _single_flight(self, key: str, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run a lookup once for all concurrent callers sharing the same key
+        
+        The first caller schedules the lookup; later callers await the same
+        in-flight future until it completes and the key is released.
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(coro_factory())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        # Shield so one cancelled caller doesn't cancel the shared lookup
+        return await asyncio.shield(future)
+    
+    async def _download_many(self, paths: List[str]) -> List[Any]:
+        """Download several JSON objects concurrently (bounded), keeping order"""
+        async def download(path: str) -> Any:
+            async with self._io_semaphore:
+                return await self.storage.download_json(path)
+        
+        return await asyncio.gather(
+            *(download(path) for path in paths),
+            return_exceptions=True
+        )
+    
+    async def flush_activities(self):
+        """Write all buffered activity log rows"""
+        await self.activity_log.flush()
+    
     async def save_agent_creation(
         self,
         agent_name: str,
@@ -62,38 +277,36 @@ class PersistenceManager:
             Agent ID
         """
         try:
-            async for session in get_db_session():
-                # Save to database
-                template = AgentTemplate(
-                    name=agent_name,
-                    role=agent_spec.get("role", "custom"),
-                    system_prompt=agent_spec.get("system_prompt", ""),
-                    tools=agent_spec.get("tools", []),
-                    config=agent_spec
-                )
-                session.add(template)
-                await session.commit()
-                await session.refresh(template)
-                
-                # Save to MinIO
-                await self.storage.upload_json(
-                    f"agents/{agent_name}.json",
-                    agent_spec
+            async with get_db_transaction() as session:
+                # Save to database - INSERT ... RETURNING avoids a refresh round-trip
+                agent_id = (await session.execute(
+                    insert(AgentTemplate).values(
+                        name=agent_name,
+                        code=agent_spec.get("code", ""),
+                        s3_key=f"agents/{agent_name}.json"
+                    ).returning(AgentTemplate.id)
+                )).scalar_one()
+            
+            # Save to MinIO
+            await self.storage.upload_json(
+                f"agents/{agent_name}.json",
+                agent_spec
+            )
+            self._agent_cache.pop(agent_name, None)
+            
+            # Save to Mem0 for cross-session memory
+            if self.mem0_enabled:
+                self._mem0_add_bg(
+                    f"Created agent: {agent_name} with role {agent_spec.get('role')}",
+                    user_id=created_by,
+                    metadata={
+                        "type": "agent_creation",
+                        "agent_name": agent_name,
+                        "task_id": task_id
+                    }
                 )
-                
-                # Save to Mem0 for cross-session memory
-                if self.mem0_enabled:
-                    self.mem0.add(
-                        f"Created agent: {agent_name} with role {agent_spec.get('role')}",
-                        user_id=created_by,
-                        metadata={
-                            "type": "agent_creation",
-                            "agent_name": agent_name,
-                            "task_id": task_id
-                        }
-                    )
-                
-                return str(template.id)
+            
+            return str(agent_id)
         except Exception as e:
             print(f"Warning: Could not save agent creation: {e}")
             return agent_name
@@ -112,37 +325,37 @@ class PersistenceManager:
             Tool ID
         """
         try:
-            async for session in get_db_session():
-                # Save to database
-                tool = Tool(
-                    name=tool_name,
-                    description=tool_spec.get("description", ""),
-                    parameters=tool_spec.get("parameters", {}),
-                    implementation=tool_spec.get("implementation", "")
-                )
-                session.add(tool)
-                await session.commit()
-                await session.refresh(tool)
-                
-                # Save to MinIO
-                await self.storage.upload_json(
-                    f"tools/{tool_name}.json",
-                    tool_spec
+            async with get_db_transaction() as session:
+                # Save to database - INSERT ... RETURNING avoids a refresh round-trip
+                tool_id = (await session.execute(
+                    insert(Tool).values(
+                        name=tool_name,
+                        description=tool_spec.get("description", ""),
+                        code=tool_spec.get("implementation", ""),
+                        s3_key=f"tools/{tool_name}.json"
+                    ).returning(Tool.id)
+                )).scalar_one()
+            
+            # Save to MinIO
+            await self.storage.upload_json(
+                f"tools/{tool_name}.json",
+                tool_spec
+            )
+            self._tool_cache.pop(tool_name, None)
+            
+            # Save to Mem0
+            if self.mem0_enabled:
+                self._mem0_add_bg(
+                    f"Created tool: {tool_name} - {tool_spec.get('description')}",
+                    user_id=created_by,
+                    metadata={
+                        "type": "tool_creation",
+                        "tool_name": tool_name,
+                        "task_id": task_id
+                    }
                 )
-                
-                # Save to Mem0
-                if self.mem0_enabled:
-                    self.mem0.add(
-                        f"Created tool: {tool_name} - {tool_spec.get('description')}",
-                        user_id=created_by,
-                        metadata={
-                            "type": "tool_creation",
-                            "tool_name": tool_name,
-                            "task_id": task_id
-                        }
-                    )
-                
-                return str(tool.id)
+            
+            return str(tool_id)
         except Exception as e:
             print(f"Warning: Could not save tool creation: {e}")
             return tool_name
@@ -160,26 +373,27 @@ class PersistenceManager:
             result_path = f"results/{task_id}/{phase_name}.json"
             await self.storage.upload_json(result_path, result)
             
-            # Save artifacts
+            # Save artifacts in parallel
             if artifacts:
-                for artifact in artifacts:
-                    artifact_path = f"artifacts/{task_id}/{Path(artifact).name}"
-                    await self.storage.upload_file(artifact, artifact_path)
+                await asyncio.gather(*(
+                    self.storage.upload_file_from_path(
+                        f"artifacts/{task_id}/{Path(artifact).name}",
+                        artifact
+                    )
+                    for artifact in artifacts
+                ))
             
-            # Log to database
-            async for session in get_db_session():
-                activity = ActivityLog(
-                    task_id=task_id,
-                    activity_type="phase_complete",
-                    message=f"Completed {phase_name}",
-                    details=result
-                )
-                session.add(activity)
-                await session.commit()
+            # Log to database (batched)
+            self.activity_log.add(
+                task_id,
+                "phase_complete",
+                f"Completed {phase_name}",
+                result
+            )
             
             # Save to Mem0 for learning
             if self.mem0_enabled:
-                self.mem0.add(
+                self._mem0_add_bg(
                     f"Successfully completed {phase_name}: {result.get('summary', '')}",
                     user_id=task_id,
                     metadata={
@@ -206,13 +420,27 @@ class PersistenceManager:
                 **pattern_data,
                 "success_rate": success_rate,
                 "use_count": use_count,
-                "last_used": datetime.utcnow().isoformat()
+                "last_used": datetime.now(timezone.utc)
             }
             await self.storage.upload_json(pattern_path, pattern_with_meta)
             
+            # Update the manifest so lookups don't have to fetch every pattern
+            async with self._pattern_index_lock:
+                index = await self.storage.download_json(PATTERN_INDEX_PATH)
+                if index is None:
+                    # Seed the manifest with patterns saved before it existed
+                    index = await self._build_pattern_index()
+                index[pattern_name] = {
+                    "success_rate": success_rate,
+                    "use_count": use_count,
+                    "path": pattern_path
+                }
+                await self.storage.upload_json(PATTERN_INDEX_PATH, index)
+            self._patterns_cache.clear()
+            
             # Save to Mem0
             if self.mem0_enabled:
-                self.mem0.add(
+                self._mem0_add_bg(
                     f"Learned pattern: {pattern_name} with {success_rate*100}% success rate",
                     user_id="system",
                     metadata={
@@ -224,8 +452,39 @@ class PersistenceManager:
         except Exception as e:
             print(f"Warning: Could not save learned pattern: {e}")
     
+    async def _build_pattern_index(self) -> Dict[str, Dict[str, Any]]:
+        """Build the pattern manifest from the pattern files in storage"""
+        pattern_files = [
+            path for path in await self.storage.list_files("patterns/")
+            if path != PATTERN_INDEX_PATH
+        ]
+        index = {}
+        for path, pattern in zip(pattern_files, await self._download_many(pattern_files)):
+            if not pattern or isinstance(pattern, Exception):
+                continue
+            index[Path(path).stem] = {
+                "success_rate": pattern.get("success_rate", 0),
+                "use_count": pattern.get("use_count", 0),
+                "path": path
+            }
+        return index
+    
     async def get_agent_by_name(self, agent_name: str) -> Optional[Dict[str, Any]]:
         """Retrieve a previously created agent"""
+        agent_spec = self._agent_cache.get(agent_name)
+        if agent_spec is not None:
+            return copy.deepcopy(agent_spec)
+        
+        agent_spec = await self._single_flight(
+            f"agent:{agent_name}",
+            lambda: self._get_agent_by_name_impl(agent_name)
+        )
+        if agent_spec is not None:
+            self._agent_cache[agent_name] = agent_spec
+            agent_spec = copy.deepcopy(agent_spec)
+        return agent_spec
+    
+    async def _get_agent_by_name_impl(self, agent_name: str) -> Optional[Dict[str, Any]]:
         try:
             # Try MinIO first (faster)
             agent_spec = await self.storage.download_json(f"agents/{agent_name}.json")
@@ -233,9 +492,9 @@ class PersistenceManager:
                 return agent_spec
             
             # Fallback to database
-            async for session in get_db_session():
+            async with get_db_transaction() as session:
                 result = await session.execute(
-                    select(AgentTemplate).where(AgentTemplate.name == agent_name)
+                    _SELECT_AGENT_BY_NAME, {"name": agent_name}
                 )
                 template = result.scalar_one_or_none()
                 if template:
@@ -253,6 +512,20 @@ class PersistenceManager:
     
     async def get_tool_by_name(self, tool_name: str) -> Optional[Dict[str, Any]]:
         """Retrieve a previously created tool"""
+        tool_spec = self._tool_cache.get(tool_name)
+        if tool_spec is not None:
+            return copy.deepcopy(tool_spec)
+        
+        tool_spec = await self._single_flight(
+            f"tool:{tool_name}",
+            lambda: self._get_tool_by_name_impl(tool_name)
+        )
+        if tool_spec is not None:
+            self._tool_cache[tool_name] = tool_spec
+            tool_spec = copy.deepcopy(tool_spec)
+        return tool_spec
+    
+    async def _get_tool_by_name_impl(self, tool_name: str) -> Optional[Dict[str, Any]]:
         try:
             # Try MinIO first
             tool_spec = await self.storage.download_json(f"tools/{tool_name}.json")
@@ -260,9 +533,9 @@ class PersistenceManager:
                 return tool_spec
             
             # Fallback to database
-            async for session in get_db_session():
+            async with get_db_transaction() as session:
                 result = await session.execute(
-                    select(Tool).where(Tool.name == tool_name)
+                    _SELECT_TOOL_BY_NAME, {"name": tool_name}
                 )
                 tool = result.scalar_one_or_none()
                 if tool:
@@ -279,14 +552,47 @@ class PersistenceManager:
     
     async def get_learned_patterns(self, min_success_rate: float = 0.7) -> List[Dict[str, Any]]:
         """Get all learned patterns above a success threshold"""
+        # Callers get their own copy so mutating a result can't corrupt the cache
+        patterns = self._patterns_cache.get(min_success_rate)
+        if patterns is not None:
+            return copy.deepcopy(patterns)
+        
+        patterns = await self._single_flight(
+            f"patterns:{min_success_rate}",
+            lambda: self._get_learned_patterns_impl(min_success_rate)
+        )
+        if patterns is None:
+            # Lookup failed; don't cache it, so the next call tries again
+            return []
+        self._patterns_cache[min_success_rate] = patterns
+        return copy.deepcopy(patterns)
+    
+    async def _get_learned_patterns_impl(self, min_success_rate: float) -> Optional[List[Dict[str, Any]]]:
         try:
-            patterns = []
-            pattern_files = await self.storage.list_files("patterns/")
+            index = await self.storage.download_json(PATTERN_INDEX_PATH)
             
-            for file_path in pattern_files:
-                pattern = await self.storage.download_json(file_path)
-                if pattern and pattern.get("success_rate", 0) >= min_success_rate:
-                    patterns.append(pattern)
+            if index is None:
+                # No manifest yet - fall back to scanning every pattern file
+                pattern_files = [
+                    path for path in await self.storage.list_files("patterns/")
+                    if path != PATTERN_INDEX_PATH
+                ]
+                candidates = await self._download_many(pattern_files)
+                patterns = [
+                    pattern for pattern in candidates
+                    if pattern and not isinstance(pattern, Exception)
+                    and pattern.get("success_rate", 0) >= min_success_rate
+                ]
+            else:
+                # Filter on the manifest, then fetch only the matching bodies
+                paths = [
+                    entry["path"] for entry in index.values()
+                    if entry.get("success_rate", 0) >= min_success_rate
+                ]
+                patterns = [
+                    pattern for pattern in await self._download_many(paths)
+                    if pattern and not isinstance(pattern, Exception)
+                ]
             
             # Sort by success rate and use count
             patterns.sort(
@@ -297,7 +603,7 @@ class PersistenceManager:
             return patterns
         except Exception as e:
             print(f"Warning: Could not retrieve learned patterns: {e}")
-            return []
+            return None
     
     async def search_memory(self, query: str, user_id: str = "system", limit: int = 5) -> List[Dict[str, Any]]:
         """Search cross-session memory using Mem0"""
@@ -321,23 +627,25 @@ class PersistenceManager:
                 "activities": []
             }
             
-            # Get results from MinIO
-            result_files = await self.storage.list_files(f"results/{task_id}/")
-            for file_path in result_files:
-                result = await self.storage.download_json(file_path)
-                if result:
-                    history["results"].append(result)
+            # List results and artifacts from MinIO together
+            result_files, artifact_files = await asyncio.gather(
+                self.storage.list_files(f"results/{task_id}/"),
+                self.storage.list_files(f"artifacts/{task_id}/")
+            )
             
-            # Get artifacts
-            artifact_files = await self.storage.list_files(f"artifacts/{task_id}/")
+            # Fetch all results concurrently
+            results = await self._download_many(result_files)
+            history["results"] = [
+                result for result in results
+                if result and not isinstance(result, Exception)
+            ]
             history["artifacts"] = artifact_files
             
-            # Get activities from database
-            async for session in get_db_session():
+            # Get activities from database, including any still buffered
+            await self.flush_activities()
+            async with get_db_transaction() as session:
                 result = await session.execute(
-                    select(ActivityLog)
-                    .where(ActivityLog.task_id == task_id)
-                    .order_by(ActivityLog.timestamp)
+                    _SELECT_TASK_ACTIVITIES, {"task_id": task_id}
                 )
                 activities = result.scalars().all()
                 history["activities"] = [
@@ -345,7 +653,7 @@ class PersistenceManager:
                         "type": a.activity_type,
                         "message": a.message,
                         "timestamp": a.timestamp.isoformat(),
-                        "details": a.details
+                        "details": a.activity_metadata
                     }
                     for a in activities
                 ]
@@ -355,6 +663,14 @@ class PersistenceManager:
             print(f"Warning: Could not retrieve task history: {e}")
             return {"task_id": task_id, "error": str(e)}
     
+    def _usage_date_str(self) -> str:
+        """UTC date bucket for usage files, only re-formatted when the day changes"""
+        day = int(time.time() // 86400)
+        if day != self._usage_day:
+            self._usage_day = day
+            self._usage_day_str = datetime.fromtimestamp(day * 86400, timezone.utc).strftime("%Y-%m-%d")
+        return self._usage_day_str
+    
     async def save_api_usage(
         self,
         service: str,
@@ -371,11 +687,11 @@ class PersistenceManager:
                 "tokens_used": tokens_used,
                 "cost": cost,
                 "task_id": task_id,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.now(timezone.utc)
             }
             
             # Append to daily usage file
-            date_str = datetime.utcnow().strftime("%Y-%m-%d")
+            date_str = self._usage_date_str()
             usage_path = f"usage/{date_str}.jsonl"
             
             # Note: This is a simplified version. In production, use proper append
@@ -396,17 +712,21 @@ class PersistenceManager:
                 "by_day": {}
             }
             
-            from datetime import timedelta
-            end_date = datetime.utcnow()
+            end_date = datetime.now(timezone.utc)
             start_date = end_date - timedelta(days=days)
             
-            for i in range(days):
-                date = start_date + timedelta(days=i)
-                date_str = date.strftime("%Y-%m-%d")
-                usage_path = f"usage/{date_str}.jsonl"
-                
-                usage_data = await self.storage.download_json(usage_path)
-                if usage_data:
+            date_strs = [
+                (start_date + timedelta(days=i)).strftime("%Y-%m-%d")
+                for i in range(days)
+            ]
+            
+            # Fetch every day's usage file concurrently
+            daily_usage = await self._download_many(
+                [f"usage/{date_str}.jsonl" for date_str in date_strs]
+            )
+            
+            for date_str, usage_data in zip(date_strs, daily_usage):
+                if usage_data and not isinstance(usage_data, Exception):
                     for entry in usage_data:
                         service = entry.get("service", "unknown")
                         tokens = entry.get("tokens_used", 0) or 0
@@ -431,6 +751,11 @@ class PersistenceManager:
         except Exception as e:
             print(f"Warning: Could not get usage stats: {e}")
             return {}
+    
+    async def cleanup(self):
+        """Flush buffered writes before shutdown"""
+        await self.flush_activities()
+        await asyncio.to_thread(self._mem0_executor.shutdown, wait=True)
 
 
 # Global persistence manager
@@ -5,7 +5,10 @@ Provides live updates on agent activity, task progress, and system status.
 """
 
 import asyncio
-from typing import Dict, Any, List, Optional
+import sys
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Deque, Dict, Any, Optional
 from datetime import datetime
 from dataclasses import dataclass
 from enum import Enum
@@ -19,7 +22,7 @@ class ProgressStatus(str, Enum):
     PAUSED = "paused"
 
 
-@dataclass
+@dataclass(slots=True)
 class ProgressUpdate:
     """Progress update from an agent or system component"""
     component_id: str
@@ -31,13 +34,41 @@ class ProgressUpdate:
     metadata: Dict[str, Any] = None
 
 
+# Status emoji for console display
+_STATUS_EMOJI = {
+    ProgressStatus.PENDING: "⏳",
+    ProgressStatus.IN_PROGRESS: "🔄",
+    ProgressStatus.COMPLETED: "✅",
+    ProgressStatus.FAILED: "❌",
+    ProgressStatus.PAUSED: "⏸️"
+}
+
+# Every possible 20-wide progress bar, indexed by filled cell count
+_BAR_LENGTH = 20
+_BARS = ["█" * filled + "░" * (_BAR_LENGTH - filled) for filled in range(_BAR_LENGTH + 1)]
+
+
 class ProgressTracker:
     """Tracks and displays real-time progress"""
     
+    # Recent update history is bounded so long-running workers don't grow forever
+    MAX_HISTORY = 10_000
+    LISTENER_QUEUE_SIZE = 256
+    
     def __init__(self):
-        self.updates: List[ProgressUpdate] = []
+        self.updates: Deque[ProgressUpdate] = deque(maxlen=self.MAX_HISTORY)
         self.component_status: Dict[str, ProgressUpdate] = {}
-        self.listeners: List[asyncio.Queue] = []
+        self.listeners: Dict[int, asyncio.Queue] = {}
+        
+        # Running aggregates over component_status, maintained in update()
+        self._progress_sum: float = 0.0
+        self._status_counts: Counter = Counter()
+        
+        # Console output is written by a background task so a slow stdout
+        # (pipes, docker logging) never stalls update()
+        self._display_queue: Optional[asyncio.Queue] = None
+        self._display_task: Optional[asyncio.Task] = None
+        self._display_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="progress-display")
         
     async def update(
         self,
@@ -59,72 +90,112 @@ class ProgressTracker:
             metadata=metadata or {}
         )
         
-        # Store update
+        # Store update, replacing this component's previous contribution
+        previous = self.component_status.get(component_id)
+        if previous is not None:
+            self._progress_sum -= previous.progress_percentage
+            self._status_counts[previous.status.value] -= 1
+        
         self.updates.append(update)
         self.component_status[component_id] = update
+        self._progress_sum += update.progress_percentage
+        self._status_counts[update.status.value] += 1
         
         # Display update
-        await self._display_update(update)
+        self._display_update(update)
         
         # Notify listeners (for WebSocket, etc.)
-        await self._notify_listeners(update)
+        self._notify_listeners(update)
     
-    async def _display_update(self, update: ProgressUpdate):
+    def _display_update(self, update: ProgressUpdate):
         """Display progress update to console"""
-        # Status emoji
-        emoji_map = {
-            ProgressStatus.PENDING: "⏳",
-            ProgressStatus.IN_PROGRESS: "🔄",
-            ProgressStatus.COMPLETED: "✅",
-            ProgressStatus.FAILED: "❌",
-            ProgressStatus.PAUSED: "⏸️"
-        }
-        
-        emoji = emoji_map.get(update.status, "📊")
+        emoji = _STATUS_EMOJI.get(update.status, "📊")
         
         # Progress bar
-        bar_length = 20
-        filled = int(bar_length * update.progress_percentage / 100)
-        bar = "█" * filled + "░" * (bar_length - filled)
+        filled = int(_BAR_LENGTH * update.progress_percentage / 100)
+        bar = _BARS[min(max(filled, 0), _BAR_LENGTH)]
         
         # Format message
-        print(f"{emoji} [{bar}] {update.progress_percentage:5.1f}% | {update.component_type.upper()}: {update.message}")
+        self._write(f"{emoji} [{bar}] {update.progress_percentage:5.1f}% | {update.component_type.upper()}: {update.message}\n")
     
-    async def _notify_listeners(self, update: ProgressUpdate):
-        """Notify WebSocket listeners of progress"""
-        for queue in self.listeners:
+    def _write(self, text: str):
+        """Queue console output for the background writer"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (sync caller) - write directly
+            sys.stdout.write(text)
+            return
+        
+        if self._display_task is None or self._display_task.done():
+            self._display_queue = asyncio.Queue()
+            self._display_task = loop.create_task(self._display_worker(self._display_queue))
+        
+        self._display_queue.put_nowait(text)
+    
+    async def _display_worker(self, queue: asyncio.Queue):
+        """Write queued console output off the event loop"""
+        write = None
+        try:
+            while True:
+                chunks = [await queue.get()]
+                while not queue.empty():
+                    chunks.append(queue.get_nowait())
+                
+                # Shielded so cancellation can't drop a write that hasn't started
+                write = self._display_executor.submit(sys.stdout.write, "".join(chunks))
+                await asyncio.shield(asyncio.wrap_future(write))
+                for _ in chunks:
+                    queue.task_done()
+        except asyncio.CancelledError:
+            # Loop is shutting down - let the in-flight write land first so
+            # lines stay in order, then write what is still queued
+            if write is not None:
+                wait([write])
+            remaining = []
+            while not queue.empty():
+                remaining.append(queue.get_nowait())
+            sys.stdout.write("".join(remaining))
+            raise
+    
+    async def flush_display(self):
+        """Wait until all queued console output has been written"""
+        if self._display_task is not None and not self._display_task.done():
+            await self._display_queue.join()
+    
+    def _notify_listeners(self, update: ProgressUpdate):
+        """Notify WebSocket listeners of progress without blocking"""
+        for queue_id, queue in list(self.listeners.items()):
             try:
-                await queue.put(update)
-            except:
-                pass
+                queue.put_nowait(update)
+            except asyncio.QueueFull:
+                # Listener isn't keeping up; drop it rather than stall everyone
+                self.listeners.pop(queue_id, None)
     
     def register_listener(self) -> asyncio.Queue:
         """Register a listener for progress updates"""
-        queue = asyncio.Queue()
-        self.listeners.append(queue)
+        queue = asyncio.Queue(maxsize=self.LISTENER_QUEUE_SIZE)
+        self.listeners[id(queue)] = queue
         return queue
     
+    def deregister_listener(self, queue: asyncio.Queue):
+        """Stop sending progress updates to a listener"""
+        self.listeners.pop(id(queue), None)
+    
     def get_overall_progress(self) -> float:
         """Calculate overall progress across all components"""
         if not self.component_status:
             return 0.0
         
-        total_progress = sum(
-            update.progress_percentage 
-            for update in self.component_status.values()
-        )
-        return total_progress / len(self.component_status)
+        return self._progress_sum / len(self.component_status)
     
     def get_status_summary(self) -> Dict[str, Any]:
         """Get summary of current status"""
-        status_counts = {}
-        for update in self.component_status.values():
-            status_counts[update.status.value] = status_counts.get(update.status.value, 0) + 1
-        
         return {
             "overall_progress": self.get_overall_progress(),
             "total_components": len(self.component_status),
-            "status_breakdown": status_counts,
+            # Unary + drops statuses whose count fell back to zero
+            "status_breakdown": dict(+self._status_counts),
             "active_components": [
                 {
                     "id": comp_id,
@@ -142,21 +213,25 @@ class ProgressTracker:
         """Display progress summary"""
         summary = self.get_status_summary()
         
-        print("\n" + "=" * 80)
-        print("📊 PROGRESS SUMMARY")
-        print("=" * 80)
-        print(f"Overall Progress: {summary['overall_progress']:.1f}%")
-        print(f"Total Components: {summary['total_components']}")
-        print(f"\nStatus Breakdown:")
+        # Goes through the same writer as updates so output stays ordered
+        lines = [
+            "\n" + "=" * 80,
+            "📊 PROGRESS SUMMARY",
+            "=" * 80,
+            f"Overall Progress: {summary['overall_progress']:.1f}%",
+            f"Total Components: {summary['total_components']}",
+            f"\nStatus Breakdown:"
+        ]
         for status, count in summary['status_breakdown'].items():
-            print(f"  {status}: {count}")
+            lines.append(f"  {status}: {count}")
         
         if summary['active_components']:
-            print(f"\nActive Components ({len(summary['active_components'])}):")
+            lines.append(f"\nActive Components ({len(summary['active_components'])}):")
             for comp in summary['active_components']:
-                print(f"  • {comp['type']}: {comp['message']} ({comp['progress']:.1f}%)")
+                lines.append(f"  • {comp['type']}: {comp['message']} ({comp['progress']:.1f}%)")
         
-        print("=" * 80 + "\n")
+        lines.append("=" * 80 + "\n")
+        self._write("\n".join(lines) + "\n")
 
 
 # Global progress tracker instance
@@ -5,60 +5,242 @@ Handles file storage for agents, tools, and knowledge base documents.
 """
 
 import asyncio
+import functools
 import io
-from typing import Optional, BinaryIO
+import itertools
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, BinaryIO, Tuple, Union
 from datetime import timedelta
+from pathlib import Path
 
+import orjson
+import urllib3
 from minio import Minio
-from minio.error import S3Error
+from minio.commonconfig import CopySource
+from minio.deleteobjects import DeleteObject
+from minio.error import S3Error, ServerError
 from ..core.config import settings
 
 
+logger = logging.getLogger(__name__)
+
+
+# Part size and parallelism for uploads read from a stream
+STREAM_PART_SIZE = 8 * 1024 * 1024
+STREAM_UPLOAD_THREADS = 8
+
+# In-memory payloads larger than one part are uploaded as parallel multipart parts
+MULTIPART_PART_SIZE = 8 * 1024 * 1024
+MULTIPART_UPLOAD_THREADS = 8
+
+# Cached presigned URLs are reused while at least half their lifetime remains
+PRESIGN_CACHE_SIZE = 4096
+
+# Storage calls are retried this many times on transient failures
+MAX_ATTEMPTS = 3
+_RETRYABLE_S3_CODES = frozenset({
+    "InternalError",
+    "RequestTimeout",
+    "ServiceUnavailable",
+    "SlowDown"
+})
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether a failed storage call is worth retrying"""
+    if isinstance(error, S3Error):
+        return error.code in _RETRYABLE_S3_CODES
+    if isinstance(error, ServerError):
+        return error.status_code >= 500
+    return isinstance(error, (urllib3.exceptions.HTTPError, ConnectionError))
+
+
+class _AsyncIteratorReader:
+    """
+    Blocking read() adapter over an async byte iterator
+    
+    Used from a worker thread; each chunk is pulled on the event loop that
+    owns the iterator.
+    """
+    
+    def __init__(self, source: AsyncIterator[bytes], loop: asyncio.AbstractEventLoop):
+        self._source = source
+        self._loop = loop
+        self._buffer = bytearray()
+        self._exhausted = False
+    
+    async def _next_chunk(self) -> Optional[bytes]:
+        try:
+            return await self._source.__anext__()
+        except StopAsyncIteration:
+            return None
+    
+    def read(self, size: int = -1) -> bytes:
+        while not self._exhausted and (size < 0 or len(self._buffer) < size):
+            chunk = asyncio.run_coroutine_threadsafe(self._next_chunk(), self._loop).result()
+            if chunk is None:
+                self._exhausted = True
+            else:
+                self._buffer += chunk
+        
+        if size < 0 or size > len(self._buffer):
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+class PendingUploads:
+    """
+    Registry of background uploads
+    
+    Producers schedule an upload and carry on; at most `max_concurrency`
+    uploads run at once. Retries are left to StorageManager._run.
+    """
+    
+    def __init__(self, max_concurrency: int):
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._sem = asyncio.Semaphore(max_concurrency)
+    
+    def schedule(self, object_name: str, upload: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Start an upload in the background and return its task"""
+        previous = self._pending.get(object_name)
+        task = asyncio.create_task(self._run(object_name, upload, previous))
+        self._pending[object_name] = task
+        task.add_done_callback(lambda t: self._forget(object_name, t))
+        return task
+    
+    async def _run(
+        self,
+        object_name: str,
+        upload: Callable[[], Awaitable[Any]],
+        previous: Optional[asyncio.Task]
+    ):
+        # Writes to the same key land in the order they were scheduled
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        
+        async with self._sem:
+            try:
+                return await upload()
+            except Exception as e:
+                logger.error("Background upload of %s failed: %s", object_name, e)
+                raise
+    
+    def _forget(self, object_name: str, task: asyncio.Task):
+        if not task.cancelled():
+            task.exception()  # already reported in _run; mark as retrieved
+        if self._pending.get(object_name) is task:
+            del self._pending[object_name]
+    
+    async def drain(self):
+        """Wait for every scheduled upload to finish"""
+        while self._pending:
+            await asyncio.gather(*self._pending.values(), return_exceptions=True)
+
+
 class StorageManager:
     """Manages object storage using MinIO"""
     
     def __init__(self):
         self.client = None
+        self._http = None
         self.bucket_name = settings.minio_bucket_name
         self.endpoint = settings.minio_endpoint
         self.access_key = settings.minio_access_key
         self.secret_key = settings.minio_secret_key
         self.use_ssl = settings.minio_use_ssl
         
+        # Dedicated pool for blocking MinIO calls so storage I/O isn't capped
+        # by (or competing for) the loop's small default executor
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.minio_max_workers,
+            thread_name_prefix="minio"
+        )
+        self.pending = PendingUploads(settings.minio_pending_uploads)
+        
+        # Caps in-flight requests to MinIO across all callers
+        self._sem = asyncio.Semaphore(settings.minio_max_concurrency)
+        
+        # (object_name, expires_seconds, expires_bucket) -> (url, url_expiry)
+        self._presign_cache: Dict[Tuple[str, int, int], Tuple[str, float]] = {}
+        
+    async def _call(self, func, *args, **kwargs):
+        """Run a blocking MinIO call on the storage I/O pool, once"""
+        loop = asyncio.get_running_loop()
+        async with self._sem:
+            return await loop.run_in_executor(
+                self._executor,
+                functools.partial(func, *args, **kwargs)
+            )
+    
+    async def _run(self, func, *args, **kwargs):
+        """
+        Run a blocking MinIO call on the storage I/O pool, retrying
+        transient failures with exponential backoff
+        
+        The call must be safe to repeat; use _call for ones that consume a
+        stream or a shared iterator.
+        """
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                return await self._call(func, *args, **kwargs)
+            except Exception as e:
+                if attempt == MAX_ATTEMPTS - 1 or not _is_transient(e):
+                    raise
+                logger.warning("Retrying storage call after error: %s", e)
+            await asyncio.sleep(2 ** attempt)
+    
     async def initialize(self):
         """Initialize MinIO client and ensure bucket exists"""
+        # Shared HTTP connection pool, sized so parallel calls on the I/O pool
+        # don't queue behind minio's default 10 connections per host
+        self._http = urllib3.PoolManager(
+            num_pools=8,
+            maxsize=128,
+            block=False,
+            # Only a quick reconnect happens here; _run owns retries with
+            # backoff, so the two layers don't multiply
+            retries=urllib3.Retry(total=1, connect=1, read=0, status=0, other=0),
+            timeout=urllib3.Timeout(connect=5, read=30)
+        )
+        
         # Create MinIO client
         self.client = Minio(
             self.endpoint,
             access_key=self.access_key,
             secret_key=self.secret_key,
-            secure=self.use_ssl
+            secure=self.use_ssl,
+            http_client=self._http
         )
         
         # Create bucket if it doesn't exist
         await self._ensure_bucket_exists()
         
-        print(f"✅ MinIO storage initialized (bucket: {self.bucket_name})")
+        logger.info("MinIO storage initialized (bucket: %s)", self.bucket_name)
     
     async def _ensure_bucket_exists(self):
         """Ensure the bucket exists, create if not"""
         try:
             # Check if bucket exists
-            bucket_exists = await asyncio.to_thread(
+            bucket_exists = await self._run(
                 self.client.bucket_exists,
                 self.bucket_name
             )
             
             if not bucket_exists:
                 # Create bucket
-                await asyncio.to_thread(
+                await self._run(
                     self.client.make_bucket,
                     self.bucket_name
                 )
-                print(f"✅ Created MinIO bucket: {self.bucket_name}")
+                logger.info("Created MinIO bucket: %s", self.bucket_name)
             
         except S3Error as e:
-            print(f"❌ Error ensuring bucket exists: {str(e)}")
+            logger.error("Error ensuring bucket exists: %s", e)
             raise
     
     async def upload_file(
@@ -81,25 +263,124 @@ class StorageManager:
             Object name (key) in the bucket
         """
         try:
-            # Convert bytes to file-like object
-            file_stream = io.BytesIO(file_data)
             file_size = len(file_data)
             
-            # Upload to MinIO
-            await asyncio.to_thread(
+            # Upload to MinIO. BytesIO shares the bytes buffer until written
+            # to, so this wraps the payload without copying it; a fresh one
+            # per attempt keeps retries reading from the start. Payloads over
+            # one part go up as a multipart upload with parts sent in parallel.
+            await self._run(
+                lambda: self.client.put_object(
+                    self.bucket_name,
+                    object_name,
+                    io.BytesIO(file_data),
+                    file_size,
+                    content_type=content_type,
+                    metadata=metadata,
+                    part_size=MULTIPART_PART_SIZE,
+                    num_parallel_uploads=MULTIPART_UPLOAD_THREADS
+                )
+            )
+            
+            return object_name
+            
+        except S3Error as e:
+            logger.error("Error uploading file %s: %s", object_name, e)
+            raise
+    
+    async def upload_stream(
+        self,
+        object_name: str,
+        source: Union[BinaryIO, AsyncIterator[bytes]],
+        length: int = -1,
+        content_type: str = "application/octet-stream",
+        metadata: dict = None,
+        part_size: int = STREAM_PART_SIZE,
+        num_threads: int = STREAM_UPLOAD_THREADS
+    ) -> str:
+        """
+        Upload from a file-like object or async byte iterator without
+        buffering the whole payload in memory
+        
+        Parts are read from the source in order and uploaded in parallel.
+        
+        Args:
+            object_name: Name/path of the object in the bucket
+            source: Readable binary stream or async iterator of byte chunks
+            length: Total size in bytes, or -1 if unknown (multipart upload)
+            content_type: MIME type of the file
+            metadata: Optional metadata dictionary
+            part_size: Multipart part size in bytes
+            num_threads: Number of parts uploaded concurrently
+            
+        Returns:
+            Object name (key) in the bucket
+        """
+        if not hasattr(source, "read"):
+            source = _AsyncIteratorReader(source, asyncio.get_running_loop())
+        
+        try:
+            # The source can only be read once, so this isn't retried
+            await self._call(
                 self.client.put_object,
                 self.bucket_name,
                 object_name,
-                file_stream,
-                file_size,
+                source,
+                length,
                 content_type=content_type,
-                metadata=metadata or {}
+                metadata=metadata,
+                part_size=part_size,
+                num_parallel_uploads=num_threads
+            )
+            
+            return object_name
+            
+        except S3Error as e:
+            logger.error("Error uploading file %s: %s", object_name, e)
+            raise
+    
+    async def upload_file_from_path(
+        self,
+        object_name: str,
+        file_path: str,
+        content_type: Optional[str] = None,
+        metadata: dict = None,
+        part_size: int = 64 * 1024 * 1024,
+        num_threads: int = 4
+    ) -> str:
+        """
+        Upload a local file to MinIO without reading it into memory
+        
+        Large files are sent as a multipart upload with parts uploaded in
+        parallel.
+        
+        Args:
+            object_name: Name/path of the object in the bucket
+            file_path: Path of the local file to upload
+            content_type: MIME type of the file (guessed from the name if omitted)
+            metadata: Optional metadata dictionary
+            part_size: Multipart part size in bytes
+            num_threads: Number of parts uploaded concurrently
+            
+        Returns:
+            Object name (key) in the bucket
+        """
+        try:
+            await self._run(
+                self.client.fput_object,
+                self.bucket_name,
+                object_name,
+                file_path,
+                content_type=content_type or _get_content_type(file_path),
+                metadata=metadata,
+                part_size=part_size,
+                num_parallel_uploads=num_threads
             )
             
             return object_name
             
         except S3Error as e:
-            print(f"❌ Error uploading file {object_name}: {str(e)}")
+            logger.error("Error uploading file %s: %s", object_name, e)
             raise
     
     async def upload_text(
@@ -113,6 +394,17 @@ class StorageManager:
         file_data = text_content.encode('utf-8')
         return await self.upload_file(object_name, file_data, content_type, metadata)
     
+    async def upload_json(
+        self,
+        object_name: str,
+        obj: Any,
+        metadata: dict = None
+    ) -> str:
+        """Serialize an object to JSON and upload it to MinIO"""
+        # orjson returns bytes directly and handles datetimes natively
+        file_data = orjson.dumps(obj, option=orjson.OPT_UTC_Z | orjson.OPT_NAIVE_UTC)
+        return await self.upload_file(object_name, file_data, "application/json", metadata)
+    
     async def download_file(self, object_name: str) -> bytes:
         """
         Download a file from MinIO
@@ -124,29 +416,36 @@ class StorageManager:
             File content as bytes
         """
         try:
-            # Download from MinIO
-            response = await asyncio.to_thread(
-                self.client.get_object,
-                self.bucket_name,
-                object_name
-            )
-            
-            # Read all data
-            data = response.read()
-            response.close()
-            response.release_conn()
-            
-            return data
+            # Download and read on the I/O pool; read() blocks on the socket
+            return await self._run(self._read_object, object_name)
             
         except S3Error as e:
-            print(f"❌ Error downloading file {object_name}: {str(e)}")
+            logger.error("Error downloading file %s: %s", object_name, e)
             raise
     
+    def _read_object(self, object_name: str) -> bytes:
+        response = self.client.get_object(self.bucket_name, object_name)
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+    
     async def download_text(self, object_name: str) -> str:
         """Download text content from MinIO"""
         data = await self.download_file(object_name)
         return data.decode('utf-8')
     
+    async def download_json(self, object_name: str) -> Optional[Any]:
+        """Download and parse a JSON object, returning None if it doesn't exist"""
+        try:
+            data = await self.download_file(object_name)
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                return None
+            raise
+        return orjson.loads(data)
+    
     async def delete_file(self, object_name: str) -> bool:
         """
         Delete a file from MinIO
@@ -158,16 +457,68 @@ class StorageManager:
             True if successful
         """
         try:
-            await asyncio.to_thread(
-                self.client.remove_object,
-                self.bucket_name,
-                object_name
+            return not await self.delete_files([object_name])
+        except S3Error:
+            return False
+    
+    async def delete_files(self, object_names: List[str]) -> list:
+        """
+        Delete several files from MinIO using batched multi-object deletes
+        
+        Args:
+            object_names: Names/paths of the objects to delete
+            
+        Returns:
+            List of DeleteError for objects that could not be deleted
+        """
+        try:
+            # remove_objects sends up to 1000 keys per request, but is lazy:
+            # errors (and the requests themselves) only happen while iterating
+            errors = await self._run(
+                lambda: list(self.client.remove_objects(
+                    self.bucket_name,
+                    (DeleteObject(name) for name in object_names)
+                ))
             )
-            return True
+            
+            for error in errors:
+                logger.error("Error deleting file %s: %s", error.name, error.message)
+            return errors
             
         except S3Error as e:
-            print(f"❌ Error deleting file {object_name}: {str(e)}")
-            return False
+            logger.error("Error deleting files: %s", e)
+            raise
+    
+    async def iter_files(self, prefix: str = "") -> AsyncIterator[str]:
+        """
+        Stream object names in the bucket with optional prefix
+        
+        Names are fetched a page at a time, so callers can stop early without
+        listing the whole prefix.
+        
+        Args:
+            prefix: Optional prefix to filter objects
+            
+        Yields:
+            Object names
+        """
+        # list_objects is lazy and paginates while iterated; pull one page per
+        # hop to the I/O pool
+        objects = self.client.list_objects(
+            self.bucket_name,
+            prefix=prefix,
+            recursive=True
+        )
+        page_size = settings.minio_list_page_size
+        
+        while True:
+            page = await self._call(
+                lambda: [obj.object_name for obj in itertools.islice(objects, page_size)]
+            )
+            for object_name in page:
+                yield object_name
+            if len(page) < page_size:
+                return
     
     async def list_files(self, prefix: str = "") -> list:
         """
@@ -180,17 +531,10 @@ class StorageManager:
             List of object names
         """
         try:
-            objects = await asyncio.to_thread(
-                self.client.list_objects,
-                self.bucket_name,
-                prefix=prefix,
-                recursive=True
-            )
-            
-            return [obj.object_name for obj in objects]
+            return [object_name async for object_name in self.iter_files(prefix)]
             
         except S3Error as e:
-            print(f"❌ Error listing files: {str(e)}")
+            logger.error("Error listing files: %s", e)
             return []
     
     async def get_presigned_url(
@@ -208,35 +552,70 @@ class StorageManager:
         Returns:
             Presigned URL
         """
+        # Bucketing on half the lifetime means a cached URL is always valid
+        # for at least expires/2 more seconds when handed out
+        lifetime = max(int(expires.total_seconds()), 2)
+        now = time.time()
+        key = (object_name, lifetime, int(now // (lifetime / 2)))
+        
+        cached = self._presign_cache.get(key)
+        if cached is not None and now < cached[1] - lifetime / 2:
+            return cached[0]
+        
         try:
-            url = await asyncio.to_thread(
+            url = await self._run(
                 self.client.presigned_get_object,
                 self.bucket_name,
                 object_name,
                 expires=expires
             )
+            
+            self._store_presigned_url(key, url, now + lifetime)
             return url
             
         except S3Error as e:
-            print(f"❌ Error generating presigned URL: {str(e)}")
+            logger.error("Error generating presigned URL: %s", e)
             raise
     
+    def _store_presigned_url(self, key: Tuple[str, int, int], url: str, url_expiry: float):
+        """Cache a presigned URL, evicting stale entries when full"""
+        if len(self._presign_cache) >= PRESIGN_CACHE_SIZE:
+            now = time.time()
+            for stale in [k for k, (_, exp) in self._presign_cache.items() if exp <= now]:
+                del self._presign_cache[stale]
+            
+            # Still full - drop the oldest insertions
+            while len(self._presign_cache) >= PRESIGN_CACHE_SIZE:
+                del self._presign_cache[next(iter(self._presign_cache))]
+        
+        self._presign_cache[key] = (url, url_expiry)
+    
     async def file_exists(self, object_name: str) -> bool:
         """Check if a file exists in MinIO"""
-        try:
-            await asyncio.to_thread(
-                self.client.stat_object,
+        # A missing key is the common case; listing answers it without the
+        # 404 -> S3Error round trip that stat_object takes. Keys come back in
+        # lexical order, so an exact match is always the first result - ask
+        # for just that one. list_objects() always sends max-keys=1000
+        # (extra_query_params can't override it), hence _list_objects.
+        def first_match():
+            objects = self.client._list_objects(
                 self.bucket_name,
-                object_name
+                prefix=object_name,
+                max_keys=1
             )
-            return True
+            return next(iter(objects), None)
+        
+        try:
+            obj = await self._run(first_match)
         except S3Error:
             return False
+        
+        return obj is not None and obj.object_name == object_name
     
     async def get_file_info(self, object_name: str) -> dict:
         """Get metadata about a file"""
         try:
-            stat = await asyncio.to_thread(
+            stat = await self._run(
                 self.client.stat_object,
                 self.bucket_name,
                 object_name
@@ -251,15 +630,63 @@ class StorageManager:
             }
             
         except S3Error as e:
-            print(f"❌ Error getting file info: {str(e)}")
+            logger.error("Error getting file info: %s", e)
             return {}
     
+    async def get_files_info(self, object_names: List[str]) -> Dict[str, dict]:
+        """
+        Get metadata about several files
+        
+        Names sharing a prefix (e.g. everything under agents/{id}/) are
+        resolved with one listing instead of a stat request per object.
+        
+        Args:
+            object_names: Names/paths of the objects
+            
+        Returns:
+            Dict mapping each object name to its info (empty if not found)
+        """
+        wanted = set(object_names)
+        prefix = os.path.commonprefix(list(wanted)) if wanted else ""
+        info: Dict[str, dict] = {}
+        
+        if prefix:
+            def list_matching():
+                return [
+                    obj for obj in self.client.list_objects(
+                        self.bucket_name,
+                        prefix=prefix,
+                        recursive=True,
+                        include_user_meta=True
+                    )
+                    if obj.object_name in wanted
+                ]
+            
+            try:
+                for obj in await self._run(list_matching):
+                    info[obj.object_name] = {
+                        "size": obj.size,
+                        "etag": obj.etag,
+                        "content_type": obj.content_type,
+                        "last_modified": obj.last_modified,
+                        "metadata": obj.metadata
+                    }
+            except S3Error as e:
+                logger.error("Error listing files: %s", e)
+        
+        # Anything the listing didn't cover falls back to a stat per object
+        misses = [name for name in wanted if name not in info]
+        for name, file_info in zip(misses, await asyncio.gather(*(
+            self.get_file_info(name) for name in misses
+        ))):
+            info[name] = file_info
+        
+        return info
+    
     async def copy_file(self, source_name: str, dest_name: str) -> bool:
         """Copy a file within the bucket"""
         try:
-            from minio.commonconfig import CopySource
-            
-            await asyncio.to_thread(
+            await self._run(
                 self.client.copy_object,
                 self.bucket_name,
                 dest_name,
@@ -268,13 +695,19 @@ class StorageManager:
             return True
             
         except S3Error as e:
-            print(f"❌ Error copying file: {str(e)}")
+            logger.error("Error copying file: %s", e)
             return False
     
+    async def drain(self):
+        """Wait for all background uploads to complete"""
+        await self.pending.drain()
+    
     async def cleanup(self):
         """Clean up resources"""
-        # MinIO client doesn't need explicit cleanup
-        pass
+        await self.drain()
+        self._executor.shutdown(wait=False)
+        if self._http is not None:
+            self._http.clear()
 
 
 # Global storage manager instance
@@ -282,17 +715,26 @@ storage_manager = StorageManager()
 
 
 # Helper functions for common operations
+#
+# These schedule the upload in the background and return the object name
+# straight away; call `await storage_manager.drain()` to wait for them.
 async def save_agent_code(agent_id: str, code: str) -> str:
     """Save agent code to storage"""
     object_name = f"agents/{agent_id}/code.py"
-    await storage_manager.upload_text(object_name, code, "text/x-python")
+    storage_manager.pending.schedule(
+        object_name,
+        lambda: storage_manager.upload_text(object_name, code, "text/x-python")
+    )
     return object_name
 
 
 async def save_tool_code(tool_id: str, code: str) -> str:
     """Save tool code to storage"""
     object_name = f"tools/{tool_id}/code.py"
-    await storage_manager.upload_text(object_name, code, "text/x-python")
+    storage_manager.pending.schedule(
+        object_name,
+        lambda: storage_manager.upload_text(object_name, code, "text/x-python")
+    )
     return object_name
 
 
@@ -300,39 +742,77 @@ async def save_knowledge_document(project_id: str, filename: str, content: bytes
     """Save knowledge base document to storage"""
     object_name = f"knowledge/{project_id}/{filename}"
     content_type = _get_content_type(filename)
-    await storage_manager.upload_file(object_name, content, content_type)
+    storage_manager.pending.schedule(
+        object_name,
+        lambda: storage_manager.upload_file(object_name, content, content_type)
+    )
+    return object_name
+
+
+async def save_knowledge_document_stream(
+    project_id: str,
+    filename: str,
+    source: Union[BinaryIO, AsyncIterator[bytes]],
+    length: int = -1
+) -> str:
+    """Save a knowledge base document from an open file or byte stream"""
+    object_name = f"knowledge/{project_id}/{filename}"
+    content_type = _get_content_type(filename)
+    await storage_manager.upload_stream(object_name, source, length, content_type)
     return object_name
 
 
-async def save_task_result(task_id: str, result_data: str) -> str:
+async def save_knowledge_document_from_path(
+    project_id: str,
+    file_path: str,
+    filename: Optional[str] = None
+) -> str:
+    """Save a knowledge base document from disk without loading it into memory"""
+    filename = filename or Path(file_path).name
+    object_name = f"knowledge/{project_id}/{filename}"
+    content_type = _get_content_type(filename)
+    await storage_manager.upload_file_from_path(object_name, file_path, content_type)
+    return object_name
+
+
+async def save_task_result(task_id: str, result_data: Union[str, Dict[str, Any]]) -> str:
     """Save task execution result to storage"""
     object_name = f"results/{task_id}/result.json"
-    await storage_manager.upload_text(object_name, result_data, "application/json")
+    if isinstance(result_data, str):
+        upload = lambda: storage_manager.upload_text(object_name, result_data, "application/json")
+    else:
+        # Serialize straight to bytes with orjson
+        upload = lambda: storage_manager.upload_json(object_name, result_data)
+    storage_manager.pending.schedule(object_name, upload)
     return object_name
 
 
+_CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'doc': 'application/msword',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'txt': 'text/plain',
+    'md': 'text/markdown',
+    'csv': 'text/csv',
+    'json': 'application/json',
+    'py': 'text/x-python',
+    'js': 'text/javascript',
+    'ts': 'text/typescript',
+    'html': 'text/html',
+    'css': 'text/css',
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'gif': 'image/gif',
+    'svg': 'image/svg+xml'
+}
+
+
+@functools.lru_cache(maxsize=1024)
 def _get_content_type(filename: str) -> str:
     """Determine content type from filename"""
-    extension = filename.lower().split('.')[-1]
-    
-    content_types = {
-        'pdf': 'application/pdf',
-        'doc': 'application/msword',
-        'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        'txt': 'text/plain',
-        'md': 'text/markdown',
-        'csv': 'text/csv',
-        'json': 'application/json',
-        'py': 'text/x-python',
-        'js': 'text/javascript',
-        'ts': 'text/typescript',
-        'html': 'text/html',
-        'css': 'text/css',
-        'png': 'image/png',
-        'jpg': 'image/jpeg',
-        'jpeg': 'image/jpeg',
-        'gif': 'image/gif',
-        'svg': 'image/svg+xml'
-    }
-    
-    return content_types.get(extension, 'application/octet-stream')
+    # rpartition is a single C-level scan; only the short suffix is lowered
+    _, dot, extension = filename.rpartition('.')
+    if not dot:
+        return 'application/octet-stream'
+    return _CONTENT_TYPES.get(extension.lower(), 'application/octet-stream')
@@ -2,12 +2,71 @@
 Utility functions for the Strands Autonomous Platform
 """
 
-import json
-import re
-from typing import Any
+import functools
+from typing import Any, Optional
+
+# re2 matches in guaranteed linear time, which matters for large or hostile
+# model output; the patterns below are compatible with both engines
+try:
+    import re2 as re
+except ImportError:
+    import re
+
+import orjson
+
 from ..models.schemas import AgentRole
 
 
+# Control characters that break JSON parsing
+_CTRL_RE = re.compile(r'[\x00-\x1f\x7f-\x9f]')
+
+# Body of the first ```json fence, else of the first fence of any kind
+# (closing fence optional)
+_JSON_FENCE_RE = re.compile(r'(?s)```json\s*(.*?)(?:```|$)')
+_FENCE_RE = re.compile(r'(?s)```\s*(.*?)(?:```|$)')
+
+# Mapping of common role variations to AgentRole
+_ROLE_MAPPING = {
+    "coding": AgentRole.CODE,
+    "code": AgentRole.CODE,
+    "coder": AgentRole.CODE,
+    "developer": AgentRole.CODE,
+    "programming": AgentRole.CODE,
+    
+    "research": AgentRole.RESEARCH,
+    "researcher": AgentRole.RESEARCH,
+    "researching": AgentRole.RESEARCH,
+    
+    "writing": AgentRole.WRITER,
+    "writer": AgentRole.WRITER,
+    "content": AgentRole.WRITER,
+    
+    "design": AgentRole.DESIGNER,
+    "designer": AgentRole.DESIGNER,
+    "designing": AgentRole.DESIGNER,
+    
+    "analysis": AgentRole.ANALYST,
+    "analyst": AgentRole.ANALYST,
+    "analyzing": AgentRole.ANALYST,
+    
+    "qa": AgentRole.QA,
+    "testing": AgentRole.QA,
+    "tester": AgentRole.QA,
+    "quality": AgentRole.QA,
+    
+    "tool_builder": AgentRole.TOOL_BUILDER,
+    "tool-builder": AgentRole.TOOL_BUILDER,
+    "toolbuilder": AgentRole.TOOL_BUILDER,
+    "tools": AgentRole.TOOL_BUILDER,
+    
+    "orchestrator": AgentRole.ORCHESTRATOR,
+    "orchestration": AgentRole.ORCHESTRATOR,
+}
+
+# Separators folded to underscores when normalizing role strings
+_ROLE_SEPARATORS = str.maketrans({"-": "_", " ": "_"})
+
+
 def extract_json_from_response(response_text: str) -> dict:
     """
     Extract JSON from Claude's response, handling markdown code blocks
@@ -19,25 +78,22 @@ def extract_json_from_response(response_text: str) -> dict:
         Parsed JSON dictionary
         
     Raises:
-        json.JSONDecodeError: If JSON cannot be parsed
+        orjson.JSONDecodeError: If JSON cannot be parsed (a subclass of
+            json.JSONDecodeError)
     """
-    # Try to extract JSON from markdown code blocks if present
-    if "```json" in response_text:
-        json_start = response_text.find("```json") + 7
-        json_end = response_text.find("```", json_start)
-        response_text = response_text[json_start:json_end].strip()
-    elif "```" in response_text:
-        json_start = response_text.find("```") + 3
-        json_end = response_text.find("```", json_start)
-        response_text = response_text[json_start:json_end].strip()
+    # Extract JSON from a markdown code block if present, preferring one
+    # tagged json over earlier fences in other languages
+    match = _JSON_FENCE_RE.search(response_text) or _FENCE_RE.search(response_text)
+    if match:
+        response_text = match.group(1)
     
     # Remove any leading/trailing whitespace
     response_text = response_text.strip()
     
     # Try to parse
     try:
-        return json.loads(response_text)
-    except json.JSONDecodeError as e:
+        return orjson.loads(response_text)
+    except orjson.JSONDecodeError as e:
         print(f"❌ Failed to parse JSON response:")
         print(f"   Response (first 500 chars): {response_text[:500]}")
         print(f"   Error: {str(e)}")
@@ -46,9 +102,12 @@ def extract_json_from_response(response_text: str) -> dict:
 
 def clean_json_string(text: str) -> str:
     """Clean a string to make it valid JSON"""
+    # Most responses are already clean - skip building a new string
+    if _CTRL_RE.search(text) is None:
+        return text
+    
     # Remove control characters
-    text = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', text)
-    return text
+    return _CTRL_RE.sub('', text)
 
 
 def normalize_agent_role(role_str: str) -> AgentRole:
@@ -61,50 +120,24 @@ def normalize_agent_role(role_str: str) -> AgentRole:
     Returns:
         Normalized AgentRole enum value
     """
-    # Mapping of common variations to AgentRole
-    role_mapping = {
-        "coding": AgentRole.CODE,
-        "code": AgentRole.CODE,
-        "coder": AgentRole.CODE,
-        "developer": AgentRole.CODE,
-        "programming": AgentRole.CODE,
-        
-        "research": AgentRole.RESEARCH,
-        "researcher": AgentRole.RESEARCH,
-        "researching": AgentRole.RESEARCH,
-        
-        "writing": AgentRole.WRITER,
-        "writer": AgentRole.WRITER,
-        "content": AgentRole.WRITER,
-        
-        "design": AgentRole.DESIGNER,
-        "designer": AgentRole.DESIGNER,
-        "designing": AgentRole.DESIGNER,
-        
-        "analysis": AgentRole.ANALYST,
-        "analyst": AgentRole.ANALYST,
-        "analyzing": AgentRole.ANALYST,
-        
-        "qa": AgentRole.QA,
-        "testing": AgentRole.QA,
-        "tester": AgentRole.QA,
-        "quality": AgentRole.QA,
-        
-        "tool_builder": AgentRole.TOOL_BUILDER,
-        "tool-builder": AgentRole.TOOL_BUILDER,
-        "toolbuilder": AgentRole.TOOL_BUILDER,
-        "tools": AgentRole.TOOL_BUILDER,
-        
-        "orchestrator": AgentRole.ORCHESTRATOR,
-        "orchestration": AgentRole.ORCHESTRATOR,
-    }
-    
     # Normalize the input
-    normalized = role_str.lower().strip().replace("-", "_").replace(" ", "_")
+    normalized = role_str.lower().strip().translate(_ROLE_SEPARATORS)
     
+    role = _resolve_role(normalized)
+    if role is not None:
+        return role
+    
+    # Default to CODE if we can't determine
+    return AgentRole.CODE
+
+
+@functools.lru_cache(maxsize=256)
+def _resolve_role(normalized: str) -> Optional[AgentRole]:
+    """Resolve a normalized role string, or None if it isn't a known role"""
     # Try direct mapping first
-    if normalized in role_mapping:
-        return role_mapping[normalized]
+    role = _ROLE_MAPPING.get(normalized)
+    if role is not None:
+        return role
     
     # Try as AgentRole value directly
     try:
@@ -112,6 +145,6 @@ def normalize_agent_role(role_str: str) -> AgentRole:
     except ValueError:
         pass
     
-    # Default to CODE if we can't determine
-    print(f"⚠️  Unknown role '{role_str}', defaulting to CODE")
-    return AgentRole.CODE
+    # Cached, so each unknown role is only reported once
+    print(f"⚠️  Unknown role '{normalized}', defaulting to CODE")
+    return None
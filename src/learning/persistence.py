@@ -6,14 +6,19 @@ and provides recommendations for future tasks.
 """
 
 import asyncio
-import json
+import functools
+import hashlib
 import uuid
-from typing import Dict, Any, List, Optional, Tuple
-from datetime import datetime, timedelta
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union
+from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass
 
+import httpx
 import numpy as np
-from sqlalchemy import select, update
+import orjson
+import xxhash
+from cachetools import LRUCache
+from sqlalchemy import func, select, update
 from anthropic import AsyncAnthropic
 from openai import AsyncOpenAI
 
@@ -22,6 +27,90 @@ from ..core.database import get_db_session
 from ..models.database import AgentTemplate, Tool, Task, AgentInstance
 from ..models.schemas import AgentRole
 
+# Numba is optional; without it the scoring kernels run as plain Python
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_http_client() -> httpx.AsyncClient:
+    """HTTP/2 connection pool shared by the module's API clients"""
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=50, max_keepalive_connections=50)
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_anthropic() -> AsyncAnthropic:
+    return AsyncAnthropic(api_key=settings.anthropic_api_key, http_client=_shared_http_client())
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_openai() -> AsyncOpenAI:
+    return AsyncOpenAI(api_key=settings.openai_api_key, http_client=_shared_http_client())
+
+
+# AgentRole is fixed; iterate its values without per-call enum dispatch
+_AGENT_ROLES = tuple(AgentRole)
+_AGENT_ROLE_VALUES = tuple(role.value for role in _AGENT_ROLES)
+
+
+# Score weights, in kernel argument order. Module-level tuples are frozen
+# into the compiled kernels as constants.
+_QUALITY_WEIGHTS = (0.3, 0.25, 0.2, 0.15, 0.1)  # completeness, accuracy, efficiency, innovation, collaboration
+_RELIABILITY_WEIGHTS = (0.4, 0.3, 0.2, 0.1)  # success, consistency, error handling, performance
+
+
+@njit(cache=True)
+def _quality_kernel(
+    completeness: float,
+    accuracy: float,
+    expected_time: float,
+    actual_time: float,
+    innovation: float,
+    collaboration: float
+) -> float:
+    """Weighted agent quality score, clamped to [0, 1]"""
+    efficiency = max(0.1, min(1.0, expected_time / actual_time))
+    w = _QUALITY_WEIGHTS
+    score = (
+        w[0] * completeness +
+        w[1] * accuracy +
+        w[2] * efficiency +
+        w[3] * innovation +
+        w[4] * collaboration
+    )
+    return min(1.0, max(0.0, score))
+
+
+@njit(cache=True)
+def _reliability_kernel(
+    success: float,
+    consistency: float,
+    error_handling: float,
+    performance: float
+) -> float:
+    """Weighted tool reliability score, clamped to [0, 1]"""
+    w = _RELIABILITY_WEIGHTS
+    score = (
+        w[0] * success +
+        w[1] * consistency +
+        w[2] * error_handling +
+        w[3] * performance
+    )
+    return min(1.0, max(0.0, score))
+
+
+# Compile now so the first evaluation doesn't pay the JIT cost
+_quality_kernel(1.0, 1.0, 1.0, 1.0, 1.0, 1.0)
+_reliability_kernel(1.0, 1.0, 1.0, 1.0)
+
 
 @dataclass
 class AgentPerformance:
@@ -34,6 +123,7 @@ class AgentPerformance:
     usage_count: int
     last_used: datetime
     error_patterns: List[str]
+    successful_executions: int = 0
 
 
 @dataclass
@@ -45,18 +135,115 @@ class ToolPerformance:
     usage_count: int
     average_execution_time: float
     reliability_score: float
-    contexts_used: List[str]
+    contexts_used: List[int]  # xxh64 digests of canonical context JSON
+    successful_executions: int = 0
+
+
+def _content_hash(text: str) -> str:
+    """Digest of the text a template's embedding was built from"""
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def _stored_embedding(value: Any) -> np.ndarray:
+    """Embedding column value as a numpy array"""
+    if hasattr(value, "to_numpy"):  # pgvector HalfVector
+        return value.to_numpy()
+    return np.asarray(value, dtype=np.float16)
+
+
+class EmbeddingIndex:
+    """
+    In-process cosine top-k over saved embeddings
+    
+    Rows are L2-normalized on insert and kept in one contiguous float32
+    matrix, so a search is a single matrix-vector product. Used when the
+    database can't serve similarity searches.
+    """
+    
+    def __init__(self, dim: int = 1536):
+        self._dim = dim
+        self._rows: Dict[str, int] = {}
+        self._records: List[Dict[str, Any]] = []
+        self._matrix = np.empty((0, dim), dtype=np.float32)
+    
+    def __len__(self) -> int:
+        return len(self._records)
+    
+    def upsert(self, key: str, embedding: np.ndarray, record: Dict[str, Any]):
+        """Insert or replace the embedding and result record for a key"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector = vector / norm
+        
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self._records)
+            if row == len(self._matrix):
+                # Grow geometrically so inserts stay amortized O(d)
+                grown = np.empty((max(16, 2 * row), self._dim), dtype=np.float32)
+                grown[:row] = self._matrix[:row]
+                self._matrix = grown
+            self._rows[key] = row
+            self._records.append(record)
+        else:
+            self._records[row] = record
+        self._matrix[row] = vector
+    
+    def top_k(
+        self,
+        query: np.ndarray,
+        k: int,
+        predicate: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ) -> List[Dict[str, Any]]:
+        """Return up to k records most similar to query, best first"""
+        size = len(self._records)
+        if not size or k <= 0:
+            return []
+        
+        query = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        
+        scores = self._matrix[:size] @ query
+        if predicate is not None:
+            mask = np.fromiter((predicate(r) for r in self._records), dtype=bool, count=size)
+            scores = np.where(mask, scores, -np.inf)
+        
+        # argpartition is O(N); only the k winners get sorted
+        k = min(k, size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        
+        return [
+            {**self._records[i], "similarity_score": float(scores[i])}
+            for i in top
+            if np.isfinite(scores[i])
+        ]
 
 
 class AgentPersistenceSystem:
     """Manages saving, loading, and learning from agents"""
     
     def __init__(self):
-        self.anthropic = AsyncAnthropic(api_key=settings.anthropic_api_key)
-        self.openai = AsyncOpenAI(api_key=settings.openai_api_key)
+        # Clients (and their connection pool) are shared across instances
+        self.anthropic = _shared_anthropic()
+        self.openai = _shared_openai()
         self.agent_performance_cache: Dict[str, AgentPerformance] = {}
         self.tool_performance_cache: Dict[str, ToolPerformance] = {}
         
+        # Histories loaded in bulk by prefetch_histories, consumed on first use
+        self._agent_history_prefetch: Dict[str, Dict[str, Any]] = {}
+        self._tool_history_prefetch: Dict[str, Dict[str, Any]] = {}
+        
+        # Embeddings are deterministic per text; keyed by a digest of the text
+        self._embedding_cache: LRUCache = LRUCache(maxsize=4096)
+        
+        # Saved templates, searchable in-process if pgvector is unreachable
+        self._agent_index = EmbeddingIndex()
+        self._tool_index = EmbeddingIndex()
+        
         # Quality thresholds for auto-saving
         self.AGENT_QUALITY_THRESHOLD = 0.8
         self.TOOL_RELIABILITY_THRESHOLD = 0.9
@@ -66,7 +253,7 @@ class AgentPersistenceSystem:
     async def evaluate_agent_performance(
         self,
         agent_id: str,
-        task_id: uuid.UUID,
+        task_id: Union[str, uuid.UUID],
         execution_result: Dict[str, Any],
         execution_time: float,
         error_count: int = 0
@@ -85,9 +272,9 @@ class AgentPersistenceSystem:
         successful_executions = historical.get("successful_executions", 0) + (1 if success else 0)
         success_rate = successful_executions / total_executions
         
-        avg_time = (
-            (historical.get("total_time", 0) + execution_time) / total_executions
-        )
+        # Running mean: avg += (x - avg) / n, no totals to accumulate error
+        avg_time = historical.get("average_time", 0.0)
+        avg_time += (execution_time - avg_time) / total_executions
         
         performance = AgentPerformance(
             agent_id=agent_id,
@@ -97,14 +284,16 @@ class AgentPersistenceSystem:
             quality_score=quality_score,
             usage_count=total_executions,
             last_used=datetime.utcnow(),
-            error_patterns=historical.get("error_patterns", [])
+            # Shared, not copied: nothing on this path mutates it
+            error_patterns=historical["error_patterns"],
+            successful_executions=successful_executions
         )
         
         # Update cache
         self.agent_performance_cache[agent_id] = performance
         
         # Check if agent should be saved
-        if await self._should_save_agent(performance):
+        if self._should_save_agent(performance):
             await self._save_agent_template(agent_id, performance, execution_result)
         
         return performance
@@ -130,12 +319,14 @@ class AgentPersistenceSystem:
         successful_executions = historical.get("successful_executions", 0) + (1 if success else 0)
         success_rate = successful_executions / total_executions
         
-        avg_time = (
-            (historical.get("total_time", 0) + execution_time) / total_executions
-        )
+        # Running mean: avg += (x - avg) / n, no totals to accumulate error
+        avg_time = historical.get("average_time", 0.0)
+        avg_time += (execution_time - avg_time) / total_executions
         
-        contexts = historical.get("contexts_used", [])
-        context_key = json.dumps(context, sort_keys=True)
+        contexts = historical["contexts_used"]
+        context_key = xxhash.xxh64_intdigest(
+            orjson.dumps(context, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        )
         if context_key not in contexts:
             contexts.append(context_key)
         
@@ -146,14 +337,16 @@ class AgentPersistenceSystem:
             usage_count=total_executions,
             average_execution_time=avg_time,
             reliability_score=reliability_score,
-            contexts_used=contexts[-10:]  # Keep last 10 contexts
+            # Keep last 10 contexts; only copy when there's something to drop
+            contexts_used=contexts if len(contexts) <= 10 else contexts[-10:],
+            successful_executions=successful_executions
         )
         
         # Update cache
         self.tool_performance_cache[tool_id] = performance
         
         # Check if tool should be saved
-        if await self._should_save_tool(performance):
+        if self._should_save_tool(performance):
             await self._save_tool_template(tool_id, performance, execution_result)
         
         return performance
@@ -170,29 +363,42 @@ class AgentPersistenceSystem:
         task_embedding = await self._create_embedding(task_description)
         
         # Search for similar agents
-        async for session in get_db_session():
-            result = await session.execute(
-                select(AgentTemplate).where(
-                    AgentTemplate.success_rate >= 0.7,
-                    AgentTemplate.usage_count >= self.MIN_USAGE_COUNT_AGENT
-                ).order_by(
-                    AgentTemplate.embedding.cosine_distance(task_embedding)
-                ).limit(max_results)
-            )
-            
-            agents = result.scalars().all()
-            
-            return [
-                {
-                    "id": str(agent.id),
-                    "name": agent.name,
-                    "success_rate": agent.success_rate,
-                    "usage_count": agent.usage_count,
-                    "similarity_score": 1 - agent.embedding.cosine_distance(task_embedding),
-                    "created_at": agent.created_at.isoformat()
-                }
-                for agent in agents
-            ]
+        try:
+            async for session in get_db_session():
+                return await self._query_similar_agents(session, task_embedding, max_results)
+        except Exception as e:
+            print(f"Warning: Similarity search failed, using in-process index: {str(e)}")
+            return self._agent_index.top_k(task_embedding, max_results, self._is_recommendable_agent)
+    
+    async def _query_similar_agents(
+        self,
+        session,
+        task_embedding: np.ndarray,
+        max_results: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Search agent templates nearest to a precomputed task embedding"""
+        
+        # The distance is computed once, in the HNSW index scan, and returned
+        # alongside each row
+        distance = AgentTemplate.embedding.cosine_distance(task_embedding).label("dist")
+        result = await session.execute(
+            select(AgentTemplate, distance).where(
+                AgentTemplate.success_rate >= 0.7,
+                AgentTemplate.usage_count >= self.MIN_USAGE_COUNT_AGENT
+            ).order_by(distance).limit(max_results)
+        )
+        
+        return [
+            {
+                "id": str(agent.id),
+                "name": agent.name,
+                "success_rate": agent.success_rate,
+                "usage_count": agent.usage_count,
+                "similarity_score": 1 - dist,
+                "created_at": agent.created_at.isoformat()
+            }
+            for agent, dist in result.all()
+        ]
     
     async def find_similar_tools(
         self,
@@ -205,30 +411,80 @@ class AgentPersistenceSystem:
         requirement_embedding = await self._create_embedding(requirement)
         
         # Search for similar tools
-        async for session in get_db_session():
-            result = await session.execute(
-                select(Tool).where(
-                    Tool.success_rate >= self.TOOL_RELIABILITY_THRESHOLD,
-                    Tool.usage_count >= self.MIN_USAGE_COUNT_TOOL
-                ).order_by(
-                    Tool.embedding.cosine_distance(requirement_embedding)
-                ).limit(max_results)
+        try:
+            async for session in get_db_session():
+                return await self._query_similar_tools(session, requirement_embedding, max_results)
+        except Exception as e:
+            print(f"Warning: Similarity search failed, using in-process index: {str(e)}")
+            return self._tool_index.top_k(requirement_embedding, max_results, self._is_recommendable_tool)
+    
+    async def _query_similar_tools(
+        self,
+        session,
+        requirement_embedding: np.ndarray,
+        max_results: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Search tools nearest to a precomputed requirement embedding"""
+        
+        distance = Tool.embedding.cosine_distance(requirement_embedding).label("dist")
+        result = await session.execute(
+            select(Tool, distance).where(
+                Tool.success_rate >= self.TOOL_RELIABILITY_THRESHOLD,
+                Tool.usage_count >= self.MIN_USAGE_COUNT_TOOL
+            ).order_by(distance).limit(max_results)
+        )
+        
+        return [
+            {
+                "id": str(tool.id),
+                "name": tool.name,
+                "description": tool.description,
+                "success_rate": tool.success_rate,
+                "usage_count": tool.usage_count,
+                "similarity_score": 1 - dist,
+                "created_at": tool.created_at.isoformat()
+            }
+            for tool, dist in result.all()
+        ]
+    
+    async def _recommendations_txn(
+        self,
+        task_embedding: np.ndarray,
+        capability_embeddings: List[np.ndarray]
+    ) -> Tuple[List[Dict[str, Any]], List[List[Dict[str, Any]]]]:
+        """Run every similarity search for a recommendation on one session"""
+        try:
+            async for session in get_db_session():
+                # Agent templates carry no role, so one search serves every role
+                similar_agents = await self._query_similar_agents(session, task_embedding)
+                similar_tools = [
+                    await self._query_similar_tools(session, embedding)
+                    for embedding in capability_embeddings
+                ]
+                return similar_agents, similar_tools
+        except Exception as e:
+            print(f"Warning: Similarity search failed, using in-process index: {str(e)}")
+            return (
+                self._agent_index.top_k(task_embedding, 5, self._is_recommendable_agent),
+                [
+                    self._tool_index.top_k(embedding, 5, self._is_recommendable_tool)
+                    for embedding in capability_embeddings
+                ]
             )
-            
-            tools = result.scalars().all()
-            
-            return [
-                {
-                    "id": str(tool.id),
-                    "name": tool.name,
-                    "description": tool.description,
-                    "success_rate": tool.success_rate,
-                    "usage_count": tool.usage_count,
-                    "similarity_score": 1 - tool.embedding.cosine_distance(requirement_embedding),
-                    "created_at": tool.created_at.isoformat()
-                }
-                for tool in tools
-            ]
+    
+    def _is_recommendable_agent(self, record: Dict[str, Any]) -> bool:
+        """Same filter the database agent search applies"""
+        return (
+            record["success_rate"] >= 0.7 and
+            record["usage_count"] >= self.MIN_USAGE_COUNT_AGENT
+        )
+    
+    def _is_recommendable_tool(self, record: Dict[str, Any]) -> bool:
+        """Same filter the database tool search applies"""
+        return (
+            record["success_rate"] >= self.TOOL_RELIABILITY_THRESHOLD and
+            record["usage_count"] >= self.MIN_USAGE_COUNT_TOOL
+        )
     
     async def get_recommendations(
         self,
@@ -237,18 +493,26 @@ class AgentPersistenceSystem:
     ) -> Dict[str, Any]:
         """Get recommendations for agents and tools"""
         
+        # Embed the task and every distinct capability in one request;
+        # repeated capabilities would only return the same tools again
+        capabilities = list(dict.fromkeys(required_capabilities))
+        task_embedding, *capability_embeddings = await self._create_embeddings_batch(
+            [task_description, *capabilities]
+        )
+        
+        similar_agents, similar_tools = await self._recommendations_txn(
+            task_embedding, capability_embeddings
+        )
+        
         # Find similar agents
-        agent_recommendations = {}
-        for role in AgentRole:
-            similar_agents = await self.find_similar_agents(task_description, role)
-            if similar_agents:
-                agent_recommendations[role.value] = similar_agents
+        agent_recommendations = (
+            dict.fromkeys(_AGENT_ROLE_VALUES, similar_agents) if similar_agents else {}
+        )
         
         # Find relevant tools
         tool_recommendations = []
-        for capability in required_capabilities:
-            similar_tools = await self.find_similar_tools(capability)
-            tool_recommendations.extend(similar_tools)
+        for tools in similar_tools:
+            tool_recommendations.extend(tools)
         
         # Remove duplicates and sort by relevance
         unique_tools = {tool["id"]: tool for tool in tool_recommendations}.values()
@@ -264,7 +528,7 @@ class AgentPersistenceSystem:
     
     async def learn_from_execution(
         self,
-        task_id: uuid.UUID,
+        task_id: Union[str, uuid.UUID],
         execution_plan: Dict[str, Any],
         results: Dict[str, Any],
         agent_performances: Dict[str, AgentPerformance],
@@ -289,17 +553,6 @@ class AgentPersistenceSystem:
     async def _calculate_quality_score(self, execution_result: Dict[str, Any]) -> float:
         """Calculate quality score for agent execution"""
         
-        # Factors that influence quality score
-        factors = {
-            "completeness": 0.3,
-            "accuracy": 0.25,
-            "efficiency": 0.2,
-            "innovation": 0.15,
-            "collaboration": 0.1
-        }
-        
-        scores = {}
-        
         # Completeness: Were all required deliverables produced?
         deliverables = execution_result.get("deliverables", [])
         expected_deliverables = execution_result.get("expected_deliverables", [])
@@ -307,74 +560,137 @@ class AgentPersistenceSystem:
             completeness = len(deliverables) / len(expected_deliverables)
         else:
             completeness = 1.0 if deliverables else 0.5
-        scores["completeness"] = completeness
-        
-        # Accuracy: Quality of outputs (simplified for now)
-        scores["accuracy"] = execution_result.get("accuracy_score", 0.8)
-        
-        # Efficiency: Time and resource usage
-        expected_time = execution_result.get("estimated_time", 300)  # 5 minutes default
-        actual_time = execution_result.get("actual_time", 300)
-        efficiency = max(0.1, min(1.0, expected_time / actual_time))
-        scores["efficiency"] = efficiency
-        
-        # Innovation: Creative solutions or novel approaches
-        scores["innovation"] = execution_result.get("innovation_score", 0.7)
-        
-        # Collaboration: How well the agent worked with others
-        scores["collaboration"] = execution_result.get("collaboration_score", 0.8)
         
-        # Calculate weighted score
-        quality_score = sum(score * weight for score, weight in zip(
-            scores.values(), factors.values()
-        ))
-        
-        return min(1.0, max(0.0, quality_score))
+        # Accuracy, efficiency (time vs. estimate, 5 minutes default),
+        # innovation and collaboration are weighted in the kernel
+        return _quality_kernel(
+            float(completeness),
+            float(execution_result.get("accuracy_score", 0.8)),
+            float(execution_result.get("estimated_time", 300)),
+            float(execution_result.get("actual_time", 300)),
+            float(execution_result.get("innovation_score", 0.7)),
+            float(execution_result.get("collaboration_score", 0.8))
+        )
     
     async def _calculate_reliability_score(self, execution_result: Dict[str, Any]) -> float:
         """Calculate reliability score for tool execution"""
         
-        # Factors for tool reliability
-        factors = {
-            "success": 0.4,
-            "consistency": 0.3,
-            "error_handling": 0.2,
-            "performance": 0.1
-        }
-        
-        scores = {}
-        
-        # Success: Did the tool complete its task?
-        scores["success"] = 1.0 if execution_result.get("success", False) else 0.0
+        # Success: Did the tool complete its task? Consistency, error
+        # handling and performance are weighted in the kernel
+        return _reliability_kernel(
+            1.0 if execution_result.get("success", False) else 0.0,
+            float(execution_result.get("consistency_score", 0.8)),
+            float(execution_result.get("error_handling_score", 0.7)),
+            float(execution_result.get("performance_score", 0.8))
+        )
+    
+    async def _create_embedding(self, text: str, fallback: bool = True) -> Optional[np.ndarray]:
+        """Create embedding for semantic search"""
+        return (await self._create_embeddings_batch([text], fallback))[0]
+    
+    async def _create_embeddings_batch(
+        self,
+        texts: List[str],
+        fallback: bool = True
+    ) -> List[Optional[np.ndarray]]:
+        """
+        Create embeddings for several texts, requesting only uncached ones
         
-        # Consistency: Consistent behavior across runs
-        scores["consistency"] = execution_result.get("consistency_score", 0.8)
+        If the request fails, uncached entries are zero vectors, or None when
+        `fallback` is False so callers that store embeddings can tell.
+        """
+        keys = [hashlib.blake2b(text.encode(), digest_size=16).digest() for text in texts]
+        
+        # Each distinct uncached text is sent once. Hits are copied out now so
+        # evictions while awaiting OpenAI can't drop them.
+        found: Dict[bytes, np.ndarray] = {}
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            embedding = self._embedding_cache.get(key)
+            if embedding is not None:
+                found[key] = embedding
+            else:
+                missing.setdefault(key, text)
         
-        # Error handling: How well errors are handled
-        scores["error_handling"] = execution_result.get("error_handling_score", 0.7)
+        if missing:
+            try:
+                response = await self.openai.embeddings.create(
+                    model="text-embedding-3-small",
+                    input=list(missing.values())
+                )
+            except Exception as e:
+                print(f"Failed to create embedding: {str(e)}")
+                # Fall back to zero embeddings for searching (not cached)
+                default = np.zeros(1536, dtype=np.float16) if fallback else None
+                return [found.get(key, default) for key in keys]
+            
+            # Results carry their input index; don't rely on response order
+            missing_keys = list(missing)
+            for item in response.data:
+                key = missing_keys[item.index]
+                found[key] = self._embedding_cache[key] = np.asarray(
+                    item.embedding, dtype=np.float16
+                )
         
-        # Performance: Speed and resource efficiency
-        scores["performance"] = execution_result.get("performance_score", 0.8)
+        return [found[key] for key in keys]
+    
+    async def prefetch_histories(
+        self,
+        agent_ids: List[str] = (),
+        tool_ids: List[str] = ()
+    ):
+        """
+        Load stored history for many agents and tools in one query each
         
-        # Calculate weighted score
-        reliability_score = sum(score * weight for score, weight in zip(
-            scores.values(), factors.values()
-        ))
+        Call before evaluating a batch of agents/tools so each evaluation
+        doesn't issue its own lookup.
+        """
+        agent_ids = [i for i in agent_ids if i not in self.agent_performance_cache]
+        tool_ids = [i for i in tool_ids if i not in self.tool_performance_cache]
+        if not agent_ids and not tool_ids:
+            return
         
-        return min(1.0, max(0.0, reliability_score))
+        async for session in get_db_session():
+            if agent_ids:
+                result = await session.execute(
+                    select(AgentTemplate).where(AgentTemplate.name.in_(agent_ids))
+                )
+                for agent in result.scalars():
+                    self._agent_history_prefetch[agent.name] = self._agent_history_from_row(agent)
+            
+            if tool_ids:
+                result = await session.execute(
+                    select(Tool).where(Tool.name.in_(tool_ids))
+                )
+                for tool in result.scalars():
+                    self._tool_history_prefetch[tool.name] = self._tool_history_from_row(tool)
     
-    async def _create_embedding(self, text: str) -> np.ndarray:
-        """Create embedding for semantic search"""
-        try:
-            response = await self.openai.embeddings.create(
-                model="text-embedding-3-small",
-                input=text
-            )
-            return np.array(response.data[0].embedding)
-        except Exception as e:
-            print(f"Failed to create embedding: {str(e)}")
-            # Return zero embedding as fallback
-            return np.zeros(1536)
+    @staticmethod
+    def _agent_history_from_row(agent: AgentTemplate) -> Dict[str, Any]:
+        return {
+            "usage_count": agent.usage_count,
+            # Rows saved before the counter existed fall back to the rate
+            "successful_executions": (
+                agent.successful_count if agent.successful_count is not None
+                else round(agent.success_rate * agent.usage_count)
+            ),
+            "average_time": agent.average_execution_time or 0.0,
+            "role": AgentRole.ORCHESTRATOR,  # Default
+            "error_patterns": []
+        }
+    
+    @staticmethod
+    def _tool_history_from_row(tool: Tool) -> Dict[str, Any]:
+        return {
+            "usage_count": tool.usage_count,
+            # Rows saved before the counter existed fall back to the rate
+            "successful_executions": (
+                tool.successful_count if tool.successful_count is not None
+                else round(tool.success_rate * tool.usage_count)
+            ),
+            "average_time": tool.average_execution_time or 0.0,
+            "contexts_used": []
+        }
     
     async def _get_agent_history(self, agent_id: str) -> Dict[str, Any]:
         """Get historical performance data for an agent"""
@@ -382,12 +698,16 @@ class AgentPersistenceSystem:
             perf = self.agent_performance_cache[agent_id]
             return {
                 "usage_count": perf.usage_count,
-                "successful_executions": int(perf.success_rate * perf.usage_count),
-                "total_time": perf.average_execution_time * perf.usage_count,
+                "successful_executions": perf.successful_executions,
+                "average_time": perf.average_execution_time,
                 "role": perf.role,
                 "error_patterns": perf.error_patterns
             }
         
+        prefetched = self._agent_history_prefetch.pop(agent_id, None)
+        if prefetched is not None:
+            return prefetched
+        
         # Query database for historical data
         async for session in get_db_session():
             result = await session.execute(
@@ -396,18 +716,12 @@ class AgentPersistenceSystem:
             agent = result.scalar_one_or_none()
             
             if agent:
-                return {
-                    "usage_count": agent.usage_count,
-                    "successful_executions": int(agent.success_rate * agent.usage_count),
-                    "total_time": 0,  # Not stored in current schema
-                    "role": AgentRole.ORCHESTRATOR,  # Default
-                    "error_patterns": []
-                }
+                return self._agent_history_from_row(agent)
         
         return {
             "usage_count": 0,
             "successful_executions": 0,
-            "total_time": 0,
+            "average_time": 0.0,
             "role": AgentRole.ORCHESTRATOR,
             "error_patterns": []
         }
@@ -418,11 +732,15 @@ class AgentPersistenceSystem:
             perf = self.tool_performance_cache[tool_id]
             return {
                 "usage_count": perf.usage_count,
-                "successful_executions": int(perf.success_rate * perf.usage_count),
-                "total_time": perf.average_execution_time * perf.usage_count,
+                "successful_executions": perf.successful_executions,
+                "average_time": perf.average_execution_time,
                 "contexts_used": perf.contexts_used
             }
         
+        prefetched = self._tool_history_prefetch.pop(tool_id, None)
+        if prefetched is not None:
+            return prefetched
+        
         # Query database for historical data
         async for session in get_db_session():
             result = await session.execute(
@@ -431,34 +749,30 @@ class AgentPersistenceSystem:
             tool = result.scalar_one_or_none()
             
             if tool:
-                return {
-                    "usage_count": tool.usage_count,
-                    "successful_executions": int(tool.success_rate * tool.usage_count),
-                    "total_time": 0,  # Not stored in current schema
-                    "contexts_used": []
-                }
+                return self._tool_history_from_row(tool)
         
         return {
             "usage_count": 0,
             "successful_executions": 0,
-            "total_time": 0,
+            "average_time": 0.0,
             "contexts_used": []
         }
     
-    async def _should_save_agent(self, performance: AgentPerformance) -> bool:
+    def _should_save_agent(self, performance: AgentPerformance) -> bool:
         """Determine if an agent should be saved based on performance"""
+        # Usage count rejects most new agents, so it's checked first
         return (
-            performance.quality_score >= self.AGENT_QUALITY_THRESHOLD and
             performance.usage_count >= self.MIN_USAGE_COUNT_AGENT and
-            performance.success_rate >= 0.7
+            performance.success_rate >= 0.7 and
+            performance.quality_score >= self.AGENT_QUALITY_THRESHOLD
         )
     
-    async def _should_save_tool(self, performance: ToolPerformance) -> bool:
+    def _should_save_tool(self, performance: ToolPerformance) -> bool:
         """Determine if a tool should be saved based on performance"""
         return (
-            performance.reliability_score >= self.TOOL_RELIABILITY_THRESHOLD and
             performance.usage_count >= self.MIN_USAGE_COUNT_TOOL and
-            performance.success_rate >= 0.9
+            performance.success_rate >= 0.9 and
+            performance.reliability_score >= self.TOOL_RELIABILITY_THRESHOLD
         )
     
     async def _save_agent_template(
@@ -473,10 +787,9 @@ class AgentPersistenceSystem:
         agent_code = execution_result.get("agent_code", "")
         system_prompt = execution_result.get("system_prompt", "")
         
-        # Create embedding for search
-        embedding = await self._create_embedding(
-            f"{performance.role.value} {system_prompt} {agent_code[:500]}"
-        )
+        # Text the search embedding is built from
+        embedding_text = f"{performance.role.value} {system_prompt} {agent_code[:500]}"
+        content_hash = _content_hash(embedding_text)
         
         async for session in get_db_session():
             # Check if agent already exists
@@ -486,26 +799,66 @@ class AgentPersistenceSystem:
             existing_agent = result.scalar_one_or_none()
             
             if existing_agent:
+                values = dict(
+                    success_rate=performance.success_rate,
+                    usage_count=performance.usage_count,
+                    successful_count=performance.successful_executions,
+                    average_execution_time=performance.average_execution_time
+                )
+                
+                # Most updates only move the counters; re-embed only when
+                # the content changed
+                stored = _stored_embedding(existing_agent.embedding) if existing_agent.embedding is not None else None
+                if stored is not None and not stored.any():
+                    # All zeros is a leftover from a failed embedding request
+                    stored = None
+                
+                if existing_agent.content_hash == content_hash and stored is not None:
+                    embedding = stored
+                else:
+                    embedding = await self._create_embedding(embedding_text, fallback=False)
+                    if embedding is not None:
+                        values.update(embedding=embedding, content_hash=content_hash)
+                    else:
+                        # Keep the old embedding and hash; the next save retries
+                        embedding = stored
+                
                 # Update existing agent
                 await session.execute(
-                    update(AgentTemplate).where(AgentTemplate.id == existing_agent.id).values(
-                        success_rate=performance.success_rate,
-                        usage_count=performance.usage_count,
-                        embedding=embedding.tolist()
-                    )
+                    update(AgentTemplate).where(AgentTemplate.id == existing_agent.id).values(**values)
                 )
             else:
+                # Create embedding for search; on failure the row is stored
+                # without a hash so the next save embeds it
+                embedding = await self._create_embedding(embedding_text, fallback=False)
+                
                 # Create new agent template
                 new_agent = AgentTemplate(
                     name=agent_id,
                     code=agent_code,
                     success_rate=performance.success_rate,
                     usage_count=performance.usage_count,
-                    embedding=embedding.tolist()
+                    successful_count=performance.successful_executions,
+                    average_execution_time=performance.average_execution_time,
+                    embedding=embedding,
+                    content_hash=content_hash if embedding is not None else None
                 )
                 session.add(new_agent)
             
             await session.commit()
+            
+            if embedding is None:
+                return
+            
+            saved = existing_agent or new_agent
+            self._agent_index.upsert(agent_id, embedding, {
+                "id": str(saved.id),
+                "name": agent_id,
+                "success_rate": performance.success_rate,
+                "usage_count": performance.usage_count,
+                # A new row's created_at is a server default that isn't loaded
+                "created_at": (existing_agent.created_at if existing_agent else datetime.now(timezone.utc)).isoformat()
+            })
     
     async def _save_tool_template(
         self,
@@ -519,10 +872,9 @@ class AgentPersistenceSystem:
         tool_code = execution_result.get("tool_code", "")
         description = execution_result.get("tool_description", "")
         
-        # Create embedding for search
-        embedding = await self._create_embedding(
-            f"{performance.name} {description} {tool_code[:500]}"
-        )
+        # Text the search embedding is built from
+        embedding_text = f"{performance.name} {description} {tool_code[:500]}"
+        content_hash = _content_hash(embedding_text)
         
         async for session in get_db_session():
             # Check if tool already exists
@@ -532,15 +884,38 @@ class AgentPersistenceSystem:
             existing_tool = result.scalar_one_or_none()
             
             if existing_tool:
+                values = dict(
+                    success_rate=performance.success_rate,
+                    usage_count=performance.usage_count,
+                    successful_count=performance.successful_executions,
+                    average_execution_time=performance.average_execution_time
+                )
+                
+                # Re-embed only when the content changed
+                stored = _stored_embedding(existing_tool.embedding) if existing_tool.embedding is not None else None
+                if stored is not None and not stored.any():
+                    # All zeros is a leftover from a failed embedding request
+                    stored = None
+                
+                if existing_tool.content_hash == content_hash and stored is not None:
+                    embedding = stored
+                else:
+                    embedding = await self._create_embedding(embedding_text, fallback=False)
+                    if embedding is not None:
+                        values.update(embedding=embedding, content_hash=content_hash)
+                    else:
+                        # Keep the old embedding and hash; the next save retries
+                        embedding = stored
+                
                 # Update existing tool
                 await session.execute(
-                    update(Tool).where(Tool.id == existing_tool.id).values(
-                        success_rate=performance.success_rate,
-                        usage_count=performance.usage_count,
-                        embedding=embedding.tolist()
-                    )
+                    update(Tool).where(Tool.id == existing_tool.id).values(**values)
                 )
             else:
+                # Create embedding for search; on failure the row is stored
+                # without a hash so the next save embeds it
+                embedding = await self._create_embedding(embedding_text, fallback=False)
+                
                 # Create new tool
                 new_tool = Tool(
                     name=performance.name,
@@ -548,11 +923,27 @@ class AgentPersistenceSystem:
                     code=tool_code,
                     success_rate=performance.success_rate,
                     usage_count=performance.usage_count,
-                    embedding=embedding.tolist()
+                    successful_count=performance.successful_executions,
+                    average_execution_time=performance.average_execution_time,
+                    embedding=embedding,
+                    content_hash=content_hash if embedding is not None else None
                 )
                 session.add(new_tool)
             
             await session.commit()
+            
+            if embedding is None:
+                return
+            
+            saved = existing_tool or new_tool
+            self._tool_index.upsert(tool_id, embedding, {
+                "id": str(saved.id),
+                "name": saved.name,
+                "description": saved.description,
+                "success_rate": performance.success_rate,
+                "usage_count": performance.usage_count,
+                "created_at": (existing_tool.created_at if existing_tool else datetime.now(timezone.utc)).isoformat()
+            })
     
     async def _analyze_success_patterns(
         self,
@@ -585,7 +976,11 @@ class AgentPersistenceSystem:
             "execution_sequence": execution_sequence,
             "total_execution_time": results.get("execution_time", 0),
             "quality_metrics": {
-                "overall_quality": np.mean([perf.quality_score for perf in agent_performances.values()]),
+                "overall_quality": float(np.fromiter(
+                    (perf.quality_score for perf in agent_performances.values()),
+                    dtype=np.float64,
+                    count=len(agent_performances)
+                ).mean()) if agent_performances else 0.0,
                 "agent_collaboration": results.get("collaboration_score", 0.8),
                 "task_completion": results.get("completion_rate", 1.0)
             }
@@ -597,7 +992,7 @@ class AgentPersistenceSystem:
         prompt = f"""
         Analyze these success patterns and generate key insights:
         
-        {json.dumps(success_patterns, indent=2)}
+        {orjson.dumps(success_patterns, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode()}
         
         Generate 3-5 actionable insights that could help improve future agent team performance.
         Focus on:
@@ -616,14 +1011,16 @@ class AgentPersistenceSystem:
                 messages=[{"role": "user", "content": prompt}]
             )
             
-            return json.loads(response.content[0].text)
+            return orjson.loads(response.content[0].text)
             
         except Exception as e:
             print(f"Failed to generate insights: {str(e)}")
             return ["Analysis failed to generate insights"]
     
-    async def _update_learning_database(self, task_id: uuid.UUID, patterns: Dict[str, Any]):
+    async def _update_learning_database(self, task_id: Union[str, uuid.UUID], patterns: Dict[str, Any]):
         """Update learning database with new patterns"""
+        # task_id is only passed through to here; parse it to a UUID (when
+        # it's a string) only once something is written to the database
         # TODO: Implement learning database updates
         # This could involve updating vector embeddings, pattern frequencies, etc.
         pass
@@ -641,21 +1038,36 @@ class AgentPersistenceSystem:
     ) -> float:
         """Calculate confidence score for recommendations"""
         
-        # Factor in number and quality of recommendations
+        # Factor in number and quality of recommendations. Each role's list is
+        # averaged first so roles weigh equally, done as one weighted mean.
         agent_confidence = 0.0
         if agent_recommendations:
-            avg_agent_similarity = np.mean([
-                np.mean([agent["similarity_score"] for agent in agents])
-                for agents in agent_recommendations.values()
-            ])
-            agent_confidence = avg_agent_similarity
+            agent_similarities = np.fromiter(
+                (
+                    agent["similarity_score"]
+                    for agents in agent_recommendations.values()
+                    for agent in agents
+                ),
+                dtype=np.float64
+            )
+            role_weights = np.fromiter(
+                (
+                    1.0 / len(agents)
+                    for agents in agent_recommendations.values()
+                    for _ in agents
+                ),
+                dtype=np.float64,
+                count=agent_similarities.size
+            )
+            agent_confidence = float(agent_similarities @ role_weights) / len(agent_recommendations)
         
         tool_confidence = 0.0
         if tool_recommendations:
-            avg_tool_similarity = np.mean([
-                tool["similarity_score"] for tool in tool_recommendations
-            ])
-            tool_confidence = avg_tool_similarity
+            tool_confidence = float(np.fromiter(
+                (tool["similarity_score"] for tool in tool_recommendations),
+                dtype=np.float64,
+                count=len(tool_recommendations)
+            ).mean())
         
         # Weight agent recommendations higher
         overall_confidence = (agent_confidence * 0.7 + tool_confidence * 0.3)
@@ -666,34 +1078,45 @@ class AgentPersistenceSystem:
         """Get comprehensive performance dashboard"""
         
         async for session in get_db_session():
-            # Get top performing agents
+            # Get top performing agents (only the columns the covering
+            # performance index holds, so this is an index-only scan)
             agents_result = await session.execute(
-                select(AgentTemplate).order_by(
+                select(
+                    AgentTemplate.name,
+                    AgentTemplate.success_rate,
+                    AgentTemplate.usage_count
+                ).order_by(
                     AgentTemplate.success_rate.desc(),
                     AgentTemplate.usage_count.desc()
                 ).limit(10)
             )
-            top_agents = agents_result.scalars().all()
+            top_agents = agents_result.all()
             
             # Get top performing tools
             tools_result = await session.execute(
-                select(Tool).order_by(
+                select(
+                    Tool.name,
+                    Tool.success_rate,
+                    Tool.usage_count
+                ).order_by(
                     Tool.success_rate.desc(),
                     Tool.usage_count.desc()
                 ).limit(10)
             )
-            top_tools = tools_result.scalars().all()
+            top_tools = tools_result.all()
             
-            # Get recent task statistics
+            # Get recent task statistics, counted in the database
             tasks_result = await session.execute(
-                select(Task).where(
-                    Task.created_at >= datetime.utcnow() - timedelta(days=7)
+                select(
+                    func.count(),
+                    func.count().filter(Task.status == "completed")
+                ).where(
+                    Task.created_at >= datetime.now(timezone.utc) - timedelta(days=7)
                 )
             )
-            recent_tasks = tasks_result.scalars().all()
+            total_tasks, tasks_completed = tasks_result.one()
             
-            completed_tasks = [t for t in recent_tasks if t.status == "completed"]
-            success_rate = len(completed_tasks) / len(recent_tasks) if recent_tasks else 0
+            success_rate = tasks_completed / total_tasks if total_tasks else 0
             
             return {
                 "top_agents": [
@@ -713,8 +1136,8 @@ class AgentPersistenceSystem:
                     for tool in top_tools
                 ],
                 "recent_performance": {
-                    "tasks_completed": len(completed_tasks),
-                    "total_tasks": len(recent_tasks),
+                    "tasks_completed": tasks_completed,
+                    "total_tasks": total_tasks,
                     "success_rate": success_rate,
                     "average_quality": np.mean([
                         perf.quality_score for perf in self.agent_performance_cache.values()
@@ -731,3 +1154,6 @@ class AgentPersistenceSystem:
         """Clean up resources"""
         self.agent_performance_cache.clear()
         self.tool_performance_cache.clear()
+        self._agent_history_prefetch.clear()
+        self._tool_history_prefetch.clear()
+        self._embedding_cache.clear()
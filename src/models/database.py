@@ -1,128 +1,227 @@
-from sqlalchemy import Column, String, Text, Float, Integer, DateTime, ForeignKey, JSON, Boolean
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import BigInteger, Column, Computed, Identity, SmallInteger, String, Text, Float, Integer, DateTime, ForeignKey, Boolean, Index, TypeDecorator, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
-from datetime import datetime
-import uuid
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import BIT, HALFVEC
+from uuid_utils.compat import uuid7  # time-ordered, returns uuid.UUID
 
 from ..core.database import Base
+from .schemas import AgentStatus, TaskStatus
+
+
+def _hnsw_cosine_index(name: str, column: str = "embedding", ops: str = "halfvec_cosine_ops") -> Index:
+    """Approximate nearest-neighbour index for cosine_distance ORDER BYs"""
+    return Index(
+        name,
+        column,
+        postgresql_using="hnsw",
+        postgresql_with={"m": 16, "ef_construction": 64},
+        postgresql_ops={column: ops}
+    )
+
+
+class EnumCode(TypeDecorator):
+    """
+    Stores a str Enum as a SMALLINT code, its position in the Enum
+    
+    New members must be appended so existing codes keep their meaning.
+    Accepts members or their plain string values; loads as members.
+    """
+    
+    impl = SmallInteger
+    cache_ok = True
+    
+    def __init__(self, enum_cls):
+        super().__init__()
+        self.enum_cls = enum_cls
+        self._members = tuple(enum_cls)
+        self._codes = {member.value: code for code, member in enumerate(self._members)}
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return self._codes[getattr(value, "value", value)]
+    
+    def process_literal_param(self, value, dialect):
+        return str(self.process_bind_param(value, dialect))
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._members[value]
 
 
 class User(Base):
     __tablename__ = "users"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     email = Column(String(255), unique=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
-    projects = relationship("Project", back_populates="user", cascade="all, delete-orphan")
+    projects = relationship("Project", back_populates="user", cascade="all, delete-orphan", lazy="raise", passive_deletes=True)
 
 
 class Project(Base):
     __tablename__ = "projects"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     name = Column(String(255), nullable=False)
     description = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
-    user = relationship("User", back_populates="projects")
-    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
-    knowledge_documents = relationship("KnowledgeDocument", back_populates="project", cascade="all, delete-orphan")
+    user = relationship("User", back_populates="projects", lazy="raise")
+    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan", lazy="raise", passive_deletes=True)
+    knowledge_documents = relationship("KnowledgeDocument", back_populates="project", cascade="all, delete-orphan", lazy="raise", passive_deletes=True)
 
 
 class Task(Base):
     __tablename__ = "tasks"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
     description = Column(Text, nullable=False)
-    status = Column(String(50), default="pending")
-    created_at = Column(DateTime, default=datetime.utcnow)
-    completed_at = Column(DateTime)
-    execution_plan = Column(JSON)
-    result = Column(JSON)
+    status = Column(EnumCode(TaskStatus), default=TaskStatus.PENDING, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    completed_at = Column(DateTime(timezone=True))
+    execution_plan = Column(JSONB)
+    result = Column(JSONB)
     
-    project = relationship("Project", back_populates="tasks")
-    agents = relationship("AgentInstance", back_populates="task", cascade="all, delete-orphan")
-    activities = relationship("ActivityLog", back_populates="task", cascade="all, delete-orphan")
+    project = relationship("Project", back_populates="tasks", lazy="raise")
+    agents = relationship("AgentInstance", back_populates="task", cascade="all, delete-orphan", lazy="raise", passive_deletes=True)
+    activities = relationship("ActivityLog", back_populates="task", cascade="all, delete-orphan", lazy="raise", passive_deletes=True)
 
 
 class AgentInstance(Base):
     __tablename__ = "agent_instances"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False, index=True)
     role = Column(String(100), nullable=False)
-    status = Column(String(50), default="idle")
+    status = Column(EnumCode(AgentStatus), default=AgentStatus.IDLE)
     e2b_sandbox_id = Column(String(255))
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     progress = Column(Float, default=0.0)
     
-    task = relationship("Task", back_populates="agents")
+    task = relationship("Task", back_populates="agents", lazy="raise")
 
 
 class AgentTemplate(Base):
     __tablename__ = "agent_templates"
+    __table_args__ = (
+        _hnsw_cosine_index("ix_agent_templates_embedding_hnsw"),
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     name = Column(String(255))
     code = Column(Text)
     s3_key = Column(String(500))
     success_rate = Column(Float, default=0.0)
     usage_count = Column(Integer, default=0)
-    embedding = Column(Vector(1536))
-    created_at = Column(DateTime, default=datetime.utcnow)
+    successful_count = Column(Integer, default=0)
+    average_execution_time = Column(Float, default=0.0)
+    embedding = Column(HALFVEC(1536))  # float16; cosine ranking tolerates it
+    content_hash = Column(String(32))  # blake2b of the text the embedding came from
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 
 class Tool(Base):
     __tablename__ = "tools"
+    __table_args__ = (
+        _hnsw_cosine_index("ix_tools_embedding_hnsw"),
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     name = Column(String(255))
     description = Column(Text)
     code = Column(Text)
     s3_key = Column(String(500))
     success_rate = Column(Float, default=0.0)
     usage_count = Column(Integer, default=0)
-    embedding = Column(Vector(1536))
-    created_at = Column(DateTime, default=datetime.utcnow)
+    successful_count = Column(Integer, default=0)
+    average_execution_time = Column(Float, default=0.0)
+    embedding = Column(HALFVEC(1536))  # float16; cosine ranking tolerates it
+    content_hash = Column(String(32))  # blake2b of the text the embedding came from
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 
 class KnowledgeDocument(Base):
     __tablename__ = "knowledge_documents"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
     filename = Column(String(255))
     s3_key = Column(String(500))
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
-    project = relationship("Project", back_populates="knowledge_documents")
+    project = relationship("Project", back_populates="knowledge_documents", lazy="raise")
 
 
 class KnowledgeChunk(Base):
     __tablename__ = "knowledge_chunks"
+    __table_args__ = (
+        _hnsw_cosine_index("ix_knowledge_chunks_embedding_hnsw"),
+        # Coarse Hamming pre-filter; candidates are reranked on the halfvec
+        Index(
+            "ix_knowledge_chunks_bq_embedding_hnsw",
+            "bq_embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"bq_embedding": "bit_hamming_ops"}
+        ),
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    document_id = Column(UUID(as_uuid=True), ForeignKey("knowledge_documents.id"), nullable=False)
+    # High-volume append table: a sequential key keeps inserts on the
+    # rightmost B-tree page; public_id is the stable external reference
+    id = Column(BigInteger, Identity(always=True), primary_key=True)
+    public_id = Column(UUID(as_uuid=True), unique=True, nullable=False, default=uuid7)
+    document_id = Column(UUID(as_uuid=True), ForeignKey("knowledge_documents.id"), nullable=False, index=True)
     chunk_text = Column(Text)
     chunk_index = Column(Integer)
-    embedding = Column(Vector(1536))
-    chunk_metadata = Column(JSON)
+    embedding = Column(HALFVEC(1536))  # float16; cosine ranking tolerates it
+    bq_embedding = Column(BIT(1536), Computed("binary_quantize(embedding)::bit(1536)", persisted=True))
+    chunk_metadata = Column(JSONB)
 
 
 class ActivityLog(Base):
     __tablename__ = "activity_logs"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id"), nullable=False)
+    # High-volume append table: a sequential key keeps inserts on the
+    # rightmost B-tree page; public_id is the stable external reference
+    id = Column(BigInteger, Identity(always=True), primary_key=True)
+    public_id = Column(UUID(as_uuid=True), unique=True, nullable=False, default=uuid7)
+    task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
     agent_id = Column(UUID(as_uuid=True))
     activity_type = Column(String(100))
     message = Column(Text)
-    timestamp = Column(DateTime, default=datetime.utcnow)
-    activity_metadata = Column(JSON)
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    activity_metadata = Column(JSONB)
     
-    task = relationship("Task", back_populates="activities")
+    task = relationship("Task", back_populates="activities", lazy="raise")
+
+
+# Dashboard queries: top performers, recently completed tasks and the
+# latest activities for a task
+Index(
+    "ix_agent_templates_perf",
+    AgentTemplate.success_rate.desc(),
+    AgentTemplate.usage_count.desc(),
+    postgresql_include=["name"]
+)
+Index(
+    "ix_tools_perf",
+    Tool.success_rate.desc(),
+    Tool.usage_count.desc(),
+    postgresql_include=["name"]
+)
+Index(
+    "ix_activity_logs_task_time",
+    ActivityLog.task_id,
+    ActivityLog.timestamp.desc(),
+    postgresql_include=["activity_type"]
+)
+Index(
+    "ix_tasks_created_at_completed",
+    Task.created_at,
+    postgresql_where=Task.status == "completed"
+)
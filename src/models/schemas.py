@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from enum import Enum
@@ -48,8 +48,7 @@ class TaskResponse(BaseModel):
     result: Optional[Dict[str, Any]]
     project_id: uuid.UUID
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class AgentSpec(BaseModel):
@@ -76,8 +75,7 @@ class AgentInstance(BaseModel):
     created_at: datetime
     progress: float = 0.0
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class ToolCreate(BaseModel):
@@ -96,8 +94,7 @@ class ToolResponse(BaseModel):
     usage_count: int
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class ActivityLog(BaseModel):
@@ -109,8 +106,7 @@ class ActivityLog(BaseModel):
     timestamp: datetime
     metadata: Optional[Dict[str, Any]]
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class KnowledgeDocument(BaseModel):
@@ -120,8 +116,7 @@ class KnowledgeDocument(BaseModel):
     s3_key: str
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class UserCreate(BaseModel):
@@ -134,8 +129,7 @@ class UserResponse(BaseModel):
     email: str
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class ProjectCreate(BaseModel):
@@ -149,5 +143,4 @@ class ProjectResponse(BaseModel):
     description: Optional[str]
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
@@ -9,13 +9,23 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from src.agents.meta_orchestrator import MetaOrchestrator
+from src.agents.meta_orchestrator import get_orchestrator
 from src.core.config import settings
 from src.core import database as db_module
 from src.core.database import Database
+from src.core.persistence import persistence
 from src.core.progress_tracker import progress_tracker, ProgressStatus
 
 
+def as_dict(item):
+    """Field values of a plan entry, whether it's a dict or a model"""
+    if isinstance(item, dict):
+        return item
+    if hasattr(item, "model_dump"):
+        return item.model_dump()
+    return item.__dict__
+
+
 async def run_test_project():
     """Run the test project"""
     
@@ -38,14 +48,15 @@ async def run_test_project():
     test_task = test_file.read_text()
     
     # Initialize database
+    # Both are kept across runs in the same process
     print("💾 Initializing Database...")
-    db_module.db = Database(settings.database_url)
+    if db_module.db is None:
+        db_module.db = Database(settings.database_url)
     print("✅ Database ready\n")
     
     # Initialize orchestrator
     print("📋 Initializing Meta-Orchestrator...")
-    orchestrator = MetaOrchestrator()
-    await orchestrator.initialize()
+    orchestrator = await get_orchestrator()
     print("✅ Meta-Orchestrator ready\n")
     
     print("🎯 Test Project:")
@@ -61,6 +72,7 @@ async def run_test_project():
         10.0,
         "Analyzing project requirements"
     )
+    await progress_tracker.flush_display()
     
     # Create execution plan
     print("\n🗺️  Creating Execution Plan...")
@@ -81,50 +93,52 @@ async def run_test_project():
             "Execution plan created"
         )
         
-        # Display the plan
-        print("\n✅ Execution Plan Created!")
-        print("=" * 80)
-        print(f"\n📊 Plan Overview:")
-        print(f"   Project ID: {project_id}")
-        print(f"   Phases: {len(execution_plan.phases)}")
-        print(f"   Agents Required: {len(execution_plan.agents)}")
-        print(f"   Estimated Duration: {execution_plan.estimated_duration} minutes")
+        # Display the plan, built up and written in one go
+        lines = [
+            "\n✅ Execution Plan Created!",
+            "=" * 80,
+            "\n📊 Plan Overview:",
+            f"   Project ID: {project_id}",
+            f"   Phases: {len(execution_plan.phases)}",
+            f"   Agents Required: {len(execution_plan.agents)}",
+            f"   Estimated Duration: {execution_plan.estimated_duration} minutes",
+            "\n📋 Execution Phases:",
+            "=" * 80
+        ]
         
         # Show phases in detail
-        print(f"\n📋 Execution Phases:")
-        print("=" * 80)
         for i, phase in enumerate(execution_plan.phases, 1):
-            phase_dict = phase if isinstance(phase, dict) else phase.__dict__
-            print(f"\n{i}. {phase_dict.get('phase_name', 'Unnamed Phase')}")
-            print(f"   Role: {phase_dict.get('required_role', 'Unknown')}")
-            print(f"   Duration: {phase_dict.get('estimated_duration', 'Unknown')} min")
-            print(f"   Description: {phase_dict.get('description', 'No description')[:100]}...")
+            d = as_dict(phase)
+            lines.append(f"\n{i}. {d.get('phase_name', 'Unnamed Phase')}")
+            lines.append(f"   Role: {d.get('required_role', 'Unknown')}")
+            lines.append(f"   Duration: {d.get('estimated_duration', 'Unknown')} min")
+            lines.append(f"   Description: {d.get('description', 'No description')[:100]}...")
             
             # Show deliverables
-            deliverables = phase_dict.get('deliverables', [])
+            deliverables = d.get('deliverables', ())
             if deliverables:
-                print(f"   Deliverables:")
+                lines.append("   Deliverables:")
                 for deliverable in deliverables[:3]:  # Show first 3
-                    print(f"     • {deliverable}")
+                    lines.append(f"     • {deliverable}")
         
         # Show agent team
-        print(f"\n👥 Agent Team Composition:")
-        print("=" * 80)
+        lines.append("\n👥 Agent Team Composition:")
+        lines.append("=" * 80)
         for agent_spec in execution_plan.agents:
-            spec_dict = agent_spec if isinstance(agent_spec, dict) else agent_spec.__dict__
-            role = spec_dict.get('role', 'Unknown')
-            print(f"\n• {role.upper()} Agent")
-            tools = spec_dict.get('tools', [])
+            d = as_dict(agent_spec)
+            role = d.get('role', 'Unknown')
+            lines.append(f"\n• {role.upper()} Agent")
+            tools = d.get('tools', ())
             if tools:
-                print(f"  Tools: {', '.join(tools[:5])}")
+                lines.append(f"  Tools: {', '.join(tools[:5])}")
         
         # Show dependencies
         if execution_plan.dependencies:
-            print(f"\n🔗 Phase Dependencies:")
-            print("=" * 80)
+            lines.append("\n🔗 Phase Dependencies:")
+            lines.append("=" * 80)
             for dep in execution_plan.dependencies[:5]:  # Show first 5
-                dep_dict = dep if isinstance(dep, dict) else dep.__dict__
-                print(f"   Phase {dep_dict.get('phase_id', '?')} depends on Phase {dep_dict.get('depends_on', '?')}")
+                d = as_dict(dep)
+                lines.append(f"   Phase {d.get('phase_id', '?')} depends on Phase {d.get('depends_on', '?')}")
         
         await progress_tracker.update(
             "orchestrator",
@@ -134,39 +148,46 @@ async def run_test_project():
             "Test project analysis completed"
         )
         
-        # Show summary
-        print("\n" + "=" * 80)
-        progress_tracker.display_summary()
+        lines.append("\n" + "=" * 80)
+        await progress_tracker.flush_display()
+        sys.stdout.write("\n".join(lines) + "\n")
         
-        print("\n✨ Test Complete!")
-        print("\n📝 Summary:")
-        print(f"   • The platform successfully analyzed the project")
-        print(f"   • Created a {len(execution_plan.phases)}-phase execution plan")
-        print(f"   • Assembled a team of {len(execution_plan.agents)} specialized agents")
-        print(f"   • Estimated completion time: {execution_plan.estimated_duration} minutes")
-        
-        print("\n💡 Next Steps:")
-        print("   1. Review the execution plan above")
-        print("   2. To execute with E2B sandboxes, run: python main.py")
-        print("   3. Or modify test_project.md and run this again")
+        # Show summary; the tracker writes in the background, so let it
+        # finish before the rest of the report
+        progress_tracker.display_summary()
+        await progress_tracker.flush_display()
         
         # Save plan to file
         from datetime import datetime
         plan_file = Path(__file__).parent / f"execution_plan_{project_id[:8]}.txt"
-        with open(plan_file, 'w') as f:
-            f.write(f"EXECUTION PLAN FOR: Task Manager API\n")
-            f.write(f"Project ID: {project_id}\n")
-            f.write(f"Generated: {datetime.now().isoformat()}\n\n")
-            f.write(f"PHASES ({len(execution_plan.phases)}):\n")
-            f.write("=" * 80 + "\n\n")
-            for i, phase in enumerate(execution_plan.phases, 1):
-                phase_dict = phase if isinstance(phase, dict) else phase.__dict__
-                f.write(f"{i}. {phase_dict.get('phase_name', 'Unnamed')}\n")
-                f.write(f"   Role: {phase_dict.get('required_role', 'Unknown')}\n")
-                f.write(f"   Duration: {phase_dict.get('estimated_duration', 'Unknown')} min\n")
-                f.write(f"   Description: {phase_dict.get('description', 'N/A')}\n\n")
+        parts = [
+            "EXECUTION PLAN FOR: Task Manager API\n",
+            f"Project ID: {project_id}\n",
+            f"Generated: {datetime.now().isoformat()}\n\n",
+            f"PHASES ({len(execution_plan.phases)}):\n",
+            "=" * 80 + "\n\n"
+        ]
+        for i, phase in enumerate(execution_plan.phases, 1):
+            d = as_dict(phase)
+            parts.append(f"{i}. {d.get('phase_name', 'Unnamed')}\n")
+            parts.append(f"   Role: {d.get('required_role', 'Unknown')}\n")
+            parts.append(f"   Duration: {d.get('estimated_duration', 'Unknown')} min\n")
+            parts.append(f"   Description: {d.get('description', 'N/A')}\n\n")
+        plan_file.write_text("".join(parts))
         
-        print(f"\n💾 Execution plan saved to: {plan_file.name}")
+        sys.stdout.write("\n".join([
+            "\n✨ Test Complete!",
+            "\n📝 Summary:",
+            "   • The platform successfully analyzed the project",
+            f"   • Created a {len(execution_plan.phases)}-phase execution plan",
+            f"   • Assembled a team of {len(execution_plan.agents)} specialized agents",
+            f"   • Estimated completion time: {execution_plan.estimated_duration} minutes",
+            "\n💡 Next Steps:",
+            "   1. Review the execution plan above",
+            "   2. To execute with E2B sandboxes, run: python main.py",
+            "   3. Or modify test_project.md and run this again",
+            f"\n💾 Execution plan saved to: {plan_file.name}"
+        ]) + "\n")
         
     except Exception as e:
         print(f"\n❌ Error: {str(e)}")
@@ -182,5 +203,13 @@ async def run_test_project():
         )
 
 
+async def main():
+    """Run the test project, then write any buffered activity logs"""
+    try:
+        await run_test_project()
+    finally:
+        await persistence.cleanup()
+
+
 if __name__ == "__main__":
-    asyncio.run(run_test_project())
+    asyncio.run(main())
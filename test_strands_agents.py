@@ -6,22 +6,29 @@ Quick test to verify agents work properly with Strands framework.
 """
 
 import asyncio
+
+import pytest
+
 from src.agents.strands_agents import (
     create_code_agent,
     create_orchestrator,
     execute_task
 )
 
+# Tests are coroutines so __main__ can run them side by side
+pytestmark = pytest.mark.asyncio
 
-def test_code_agent():
+
+async def test_code_agent():
     """Test the code agent directly"""
+    agent = create_code_agent()
+    # Agent calls block, so they run in worker threads; output is printed
+    # after the call returns so concurrent tests don't interleave
+    response = await asyncio.to_thread(agent, "Write a Python function to calculate fibonacci numbers")
+    
     print("=" * 80)
     print("TEST 1: Code Agent - Write a simple Python function")
     print("=" * 80)
-    
-    agent = create_code_agent()
-    response = agent("Write a Python function to calculate fibonacci numbers")
-    
     print("\nResponse:")
     if hasattr(response, 'content'):
         print(response.content[0].text if response.content else str(response))
@@ -31,15 +38,14 @@ def test_code_agent():
     print("\n✅ Code agent test complete\n")
 
 
-def test_orchestrator():
+async def test_orchestrator():
     """Test the orchestrator with multi-agent routing"""
+    orchestrator = create_orchestrator()
+    response = await asyncio.to_thread(orchestrator, "Create a simple README.md file for a Python project")
+    
     print("=" * 80)
     print("TEST 2: Orchestrator - Route to appropriate agent")
     print("=" * 80)
-    
-    orchestrator = create_orchestrator()
-    response = orchestrator("Create a simple README.md file for a Python project")
-    
     print("\nResponse:")
     if hasattr(response, 'content'):
         print(response.content[0].text if response.content else str(response))
@@ -49,35 +55,37 @@ def test_orchestrator():
     print("\n✅ Orchestrator test complete\n")
 
 
-def test_execute_task():
+async def test_execute_task():
     """Test the convenience function"""
-    print("=" * 80)
-    print("TEST 3: Execute Task - Convenience function")
-    print("=" * 80)
-    
-    response = execute_task(
+    response = await asyncio.to_thread(
+        execute_task,
         "List the files in the current directory",
         agent_type="code"
     )
     
+    print("=" * 80)
+    print("TEST 3: Execute Task - Convenience function")
+    print("=" * 80)
     print("\nResponse:")
     print(response)
     
     print("\n✅ Execute task test complete\n")
 
 
+async def run_all():
+    """Run the three independent agent tests concurrently"""
+    await asyncio.gather(
+        test_code_agent(),
+        test_orchestrator(),
+        test_execute_task()
+    )
+
+
 if __name__ == "__main__":
     print("\n🚀 Testing Strands-Native Agent Implementation\n")
     
     try:
-        # Test 1: Code agent
-        test_code_agent()
-        
-        # Test 2: Orchestrator
-        test_orchestrator()
-        
-        # Test 3: Execute task
-        test_execute_task()
+        asyncio.run(run_all())
         
         print("=" * 80)
         print("✅ ALL TESTS PASSED - Strands agents working properly!")
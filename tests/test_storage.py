@@ -0,0 +1,100 @@
+"""Tests for StorageManager metadata lookups"""
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("minio")
+
+from src.core.storage import StorageManager
+
+
+def _obj(name, size=1):
+    return SimpleNamespace(
+        object_name=name,
+        size=size,
+        etag=f"etag-{name}",
+        content_type="text/plain",
+        last_modified=None,
+        metadata={}
+    )
+
+
+class FakeMinio:
+    """Serves list_objects from `listed` and stat_object from `stats`"""
+    
+    def __init__(self, listed, stats=None):
+        self.listed = listed
+        self.stats = stats or {}
+        self.list_prefixes = []
+        self.stat_calls = []
+    
+    def list_objects(self, bucket_name, prefix=None, recursive=False, include_user_meta=False):
+        self.list_prefixes.append(prefix)
+        return iter([obj for obj in self.listed if obj.object_name.startswith(prefix)])
+    
+    def _list_objects(self, bucket_name, prefix=None, max_keys=None):
+        self.list_prefixes.append(prefix)
+        return iter([obj for obj in self.listed if obj.object_name.startswith(prefix)][:max_keys])
+    
+    def stat_object(self, bucket_name, object_name):
+        self.stat_calls.append(object_name)
+        return self.stats[object_name]
+
+
+@pytest.fixture
+def manager():
+    manager = StorageManager()
+    yield manager
+    manager._executor.shutdown(wait=False)
+
+
+@pytest.mark.asyncio
+async def test_get_files_info_uses_one_listing_for_shared_prefix(manager):
+    manager.client = FakeMinio([
+        _obj("agents/a1/code.py", 10),
+        _obj("agents/a1/meta.json", 20),
+        _obj("agents/a1/other.txt", 30)
+    ])
+    
+    info = await manager.get_files_info(["agents/a1/code.py", "agents/a1/meta.json"])
+    
+    assert info["agents/a1/code.py"]["size"] == 10
+    assert info["agents/a1/meta.json"]["size"] == 20
+    assert set(info) == {"agents/a1/code.py", "agents/a1/meta.json"}
+    assert manager.client.list_prefixes == ["agents/a1/"]
+    assert manager.client.stat_calls == []
+
+
+@pytest.mark.asyncio
+async def test_get_files_info_stats_names_missing_from_listing(manager):
+    manager.client = FakeMinio(
+        [_obj("agents/a1/code.py", 10)],
+        stats={"agents/a1/meta.json": _obj("agents/a1/meta.json", 20)}
+    )
+    
+    info = await manager.get_files_info(["agents/a1/code.py", "agents/a1/meta.json"])
+    
+    assert info["agents/a1/code.py"]["size"] == 10
+    assert info["agents/a1/meta.json"]["size"] == 20
+    assert manager.client.stat_calls == ["agents/a1/meta.json"]
+
+
+@pytest.mark.asyncio
+async def test_get_files_info_empty(manager):
+    manager.client = FakeMinio([])
+    
+    assert await manager.get_files_info([]) == {}
+    assert manager.client.list_prefixes == []
+
+
+@pytest.mark.asyncio
+async def test_file_exists_matches_exact_key_only(manager):
+    manager.client = FakeMinio([
+        _obj("patterns/api.json"),
+        _obj("patterns/api.json.bak")
+    ])
+    
+    assert await manager.file_exists("patterns/api.json")
+    assert not await manager.file_exists("patterns/api")
+    assert not await manager.file_exists("patterns/missing.json")
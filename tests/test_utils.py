@@ -0,0 +1,30 @@
+"""Tests for model-output parsing helpers"""
+
+import pytest
+
+pytest.importorskip("orjson")
+pytest.importorskip("pydantic")
+
+from src.core.utils import extract_json_from_response
+
+
+def test_extract_json_plain():
+    assert extract_json_from_response(' {"a": 1} ') == {"a": 1}
+
+
+def test_extract_json_from_json_fence():
+    text = 'Here you go:\n```json\n{"a": 1}\n```\nDone.'
+    assert extract_json_from_response(text) == {"a": 1}
+
+
+def test_extract_json_from_untagged_fence():
+    assert extract_json_from_response('```\n{"a": 1}\n```') == {"a": 1}
+
+
+def test_extract_json_prefers_json_fence_over_earlier_fences():
+    text = 'Run this first:\n```bash\nls\n```\nThen:\n```json\n{"a": 1}\n```'
+    assert extract_json_from_response(text) == {"a": 1}
+
+
+def test_extract_json_unclosed_fence():
+    assert extract_json_from_response('```json\n{"a": 1}') == {"a": 1}